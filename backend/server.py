@@ -1,40 +1,667 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, Query, Request, Response, status
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import CursorType, ReturnDocument, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError, CollectionInvalid
+from contextvars import ContextVar
+from contextlib import asynccontextmanager, contextmanager
+import sys
 import os
+import json
+import gzip
+import hmac
+import hashlib
+import secrets
+import math
+import re
+import time
+import random
+import asyncio
+import functools
+import threading
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+from collections import Counter, OrderedDict, deque
 import uuid
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 import jwt
 import bcrypt
+import numpy as np
 from enum import Enum
 
+try:
+    import msgpack
+except ImportError:  # optional, only needed for application/msgpack responses
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is used when brotli is unavailable
+    brotli = None
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# Request tracing configuration
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', '2'))
+PROFILE_MAX_CONCURRENT = int(os.environ.get('PROFILE_MAX_CONCURRENT', '4'))
+PROFILE_MAX_STACKS = 50
+TRACE_BUFFER_SIZE = int(os.environ.get('TRACE_BUFFER_SIZE', '200'))
+
+# Request tracing
+class RequestTrace:
+    """Span timings (and optionally a sampling profile) collected for a single request"""
+
+    def __init__(self, method: str, path: str, explicit: bool, sampled: bool):
+        self.id = str(uuid.uuid4())
+        self.method = method
+        self.path = path
+        self.explicit = explicit
+        self.sampled = sampled
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.duration = None
+        self.status_code = None
+        self.user_id = None
+        self.workspace_id = None
+        self.is_admin = False
+        self.spans = []
+        self.profiler = None
+
+    def add_span(self, name: str, start: float, end: float, **attributes):
+        # Called from motor's executor threads too; list.append is atomic
+        self.spans.append((name, start, end, attributes))
+
+    def start_profiler(self):
+        global active_profilers
+        if self.profiler is None and active_profilers < PROFILE_MAX_CONCURRENT:
+            active_profilers += 1
+            self.profiler = SamplingProfiler(threading.get_ident(), PROFILE_INTERVAL_MS / 1000)
+            self.profiler.start()
+
+    def finish(self, status_code: Optional[int]):
+        global active_profilers
+        self.duration = time.perf_counter() - self.started
+        self.status_code = status_code
+        if self.profiler is not None:
+            self.profiler.stop()
+            active_profilers -= 1
+
+    def summary(self) -> dict:
+        totals: Dict[str, float] = {}
+        for name, start, end, _ in self.spans:
+            key = name.split('.')[0]
+            totals[key] = totals.get(key, 0.0) + (end - start) * 1000
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status_code": self.status_code,
+            "user_id": self.user_id,
+            "sampled": self.sampled,
+            "started_at": self.started_at,
+            "duration_ms": round((self.duration or 0) * 1000, 3),
+            "span_totals_ms": {name: round(total, 3) for name, total in totals.items()},
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            **self.summary(),
+            "spans": [
+                {
+                    "name": name,
+                    "start_ms": round((start - self.started) * 1000, 3),
+                    "duration_ms": round((end - start) * 1000, 3),
+                    **attributes
+                }
+                for name, start, end, attributes in sorted(self.spans, key=lambda span: span[1])
+            ],
+            "profile": self.profiler.result() if self.profiler else None,
+        }
+
+class SamplingProfiler:
+    """Samples the event loop thread's call stack from a background thread.
+
+    The loop is shared, so samples show whatever it ran while the traced request was in flight,
+    including other requests and idle time in the selector.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._result: Optional[dict] = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        # Called on the event loop, so only signal; the thread publishes its result on the way out
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+        self._result = {
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "stacks": [
+                {"stack": stack, "count": count}
+                for stack, count in self.stacks.most_common(PROFILE_MAX_STACKS)
+            ],
+        }
+
+    def result(self) -> Optional[dict]:
+        """Collapsed stacks (flamegraph.pl / speedscope format), most frequent first; None until the
+        sampling thread has exited"""
+        return self._result
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("current_trace", default=None)
+active_profilers = 0
+trace_buffer = deque(maxlen=TRACE_BUFFER_SIZE)
+
+@contextmanager
+def trace_span(name: str, **attributes):
+    """Record a span on the current request trace; a no-op for untraced requests"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_span(name, start, time.perf_counter(), **attributes)
+
+class MongoCommandTracer(monitoring.CommandListener):
+    """Record every Mongo command of a traced request as a span (motor copies the context into its executor)"""
+
+    def __init__(self):
+        self.pending = {}
+
+    def started(self, event):
+        trace = _current_trace.get()
+        if trace is not None:
+            self.pending[(event.connection_id, event.request_id)] = (
+                trace, time.perf_counter(), event.command.get(event.command_name)
+            )
+
+    def _finish(self, event, failed: bool):
+        entry = self.pending.pop((event.connection_id, event.request_id), None)
+        if entry is not None:
+            trace, start, target = entry
+            attributes = {"collection": target} if isinstance(target, str) else {}
+            if failed:
+                attributes["failed"] = True
+            trace.add_span(f"mongo.{event.command_name}", start, time.perf_counter(), **attributes)
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+class TracedRoute(APIRoute):
+    """APIRoute recording handler and response serialization spans for traced requests"""
+
+    def __init__(self, path, endpoint, **kwargs):
+        # include_router re-creates routes from already wrapped endpoints
+        if asyncio.iscoroutinefunction(endpoint) and not getattr(endpoint, "is_traced", False):
+            endpoint = self.trace_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    @staticmethod
+    def trace_endpoint(endpoint):
+        @functools.wraps(endpoint)
+        async def traced_endpoint(*args, **kwargs):
+            with trace_span("handler"):
+                return await endpoint(*args, **kwargs)
+        traced_endpoint.is_traced = True
+        return traced_endpoint
+
+    def get_route_handler(self):
+        route_handler = super().get_route_handler()
+
+        async def traced_route_handler(request):
+            trace = _current_trace.get()
+            if trace is None:
+                return await route_handler(request)
+            response = await route_handler(request)
+            handler_ends = [end for name, _, end, _ in trace.spans if name == "handler"]
+            if handler_ends:
+                # Response model validation and encoding run after the endpoint returns
+                trace.add_span("serialize", handler_ends[-1], time.perf_counter())
+            return response
+
+        return traced_route_handler
+
+class ProfilingMiddleware:
+    """Trace requests flagged with `X-Profile: 1` / `?profile=1` (kept for admins only) or sampled at PROFILE_SAMPLE_RATE"""
+
+    def __init__(self, app, sample_rate: float = PROFILE_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    @staticmethod
+    def is_flagged(scope) -> bool:
+        if Headers(scope=scope).get("x-profile", "").lower() in ("1", "true"):
+            return True
+        query = scope.get("query_string", b"").decode("latin-1")
+        return any(part in ("profile=1", "profile=true") for part in query.split("&"))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith("/api") or scope["path"].startswith("/api/admin/traces"):
+            await self.app(scope, receive, send)
+            return
+
+        explicit = self.is_flagged(scope)
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        if not explicit and not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace(scope["method"], scope["path"], explicit, sampled)
+        if sampled:
+            trace.start_profiler()
+        token = _current_trace.set(trace)
+        status_code = None
+
+        async def send_with_trace_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if sampled or trace.is_admin:
+                    MutableHeaders(raw=message["headers"])["X-Trace-Id"] = trace.id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace_id)
+        finally:
+            _current_trace.reset(token)
+            trace.finish(status_code)
+            if sampled or trace.is_admin:
+                trace_buffer.append(trace)
+
+# MongoDB connection configuration
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '10'))
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '0'))  # 0 = keep idle connections
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '0'))  # 0 = wait indefinitely
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '20000'))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '30000'))
+MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', '0'))  # 0 = no timeout
+WARMUP_CONNECTIONS = int(os.environ.get('WARMUP_CONNECTIONS', str(MONGO_MIN_POOL_SIZE)))
+READINESS_TIMEOUT_SECONDS = float(os.environ.get('READINESS_TIMEOUT_SECONDS', '2'))
+POOL_WAIT_SAMPLES = 1000
+
+# MongoDB connection pool monitoring
+class ConnectionPoolMonitor(monitoring.ConnectionPoolListener):
+    """Occupancy and checkout wait times of this process's connection pools.
+
+    pymongo emits the checkout events on the thread doing the checkout, so the start time is kept
+    in a thread-local and matched with the checked-out (or failed) event that follows.
+    """
+
+    def __init__(self, samples: int = POOL_WAIT_SAMPLES):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.waits: deque = deque(maxlen=samples)
+        self.open = 0
+        self.in_use = 0
+        self.waiting = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.clears = 0
+
+    def checkout_finished(self) -> Optional[float]:
+        started = getattr(self.local, "started", None)
+        self.local.started = None
+        return time.perf_counter() - started if started is not None else None
+
+    def connection_check_out_started(self, event):
+        self.local.started = time.perf_counter()
+        with self.lock:
+            self.waiting += 1
+
+    def connection_checked_out(self, event):
+        wait = self.checkout_finished()
+        with self.lock:
+            if wait is not None:
+                self.waiting -= 1
+                self.waits.append(wait)
+            self.in_use += 1
+            self.checkouts += 1
+
+    def connection_check_out_failed(self, event):
+        wait = self.checkout_finished()
+        with self.lock:
+            if wait is not None:
+                self.waiting -= 1
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self.lock:
+            self.in_use -= 1
+
+    def connection_created(self, event):
+        with self.lock:
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self.lock:
+            self.open -= 1
+
+    def pool_cleared(self, event):
+        with self.lock:
+            self.clears += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            waits = sorted(self.waits)
+            stats = {
+                "max_size": MONGO_MAX_POOL_SIZE,
+                "min_size": MONGO_MIN_POOL_SIZE,
+                "open": self.open,
+                "in_use": self.in_use,
+                "waiting": self.waiting,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "clears": self.clears
+            }
+        percentile = lambda fraction: round(waits[min(len(waits) - 1, int(fraction * len(waits)))] * 1000, 3)
+        stats["checkout_wait_ms"] = {
+            "samples": len(waits),
+            "mean": round(sum(waits) / len(waits) * 1000, 3),
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": round(waits[-1] * 1000, 3)
+        } if waits else {"samples": 0}
+        return stats
+
+pool_monitor = ConnectionPoolMonitor()
+
+# MongoDB connection; the client is created in the lifespan handler, not at import
+client: Optional[AsyncIOMotorClient] = None
+db = None
+
+def create_mongo_client() -> AsyncIOMotorClient:
+    return AsyncIOMotorClient(
+        mongo_url,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS or None,
+        waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS or None,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS or None,
+        event_listeners=[MongoCommandTracer(), pool_monitor]
+    )
+
+# Workspace configuration
+DEFAULT_WORKSPACE_ID = os.environ.get('DEFAULT_WORKSPACE_ID', 'default')
+TENANT_COLLECTIONS = ["users", "campaigns", "tasks", "campaign_templates"]
 
 # JWT Configuration
 SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.environ.get('REFRESH_TOKEN_EXPIRE_DAYS', '14'))
+
+# Response encoding configuration
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+GZIP_COMPRESS_LEVEL = int(os.environ.get('GZIP_COMPRESS_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', '5'))
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_EXT_TABLE = 1  # Extension type holding [columns, rows] for a list of objects with the same keys
+
+# Background job configuration
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+JOB_BATCH_SIZE = int(os.environ.get('JOB_BATCH_SIZE', '50'))
+JOB_LEASE_SECONDS = int(os.environ.get('JOB_LEASE_SECONDS', '60'))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', '5'))
+JOB_RETRY_BASE_SECONDS = float(os.environ.get('JOB_RETRY_BASE_SECONDS', '5'))
+JOB_POLL_INTERVAL_SECONDS = float(os.environ.get('JOB_POLL_INTERVAL_SECONDS', '1'))
+JOB_RETENTION_DAYS = int(os.environ.get('JOB_RETENTION_DAYS', '7'))
+NOTIFICATION_SINK = os.environ.get('NOTIFICATION_SINK', 'log')  # "log" or "file:<path>"
+SCHEDULER_INTERVAL_SECONDS = float(os.environ.get('SCHEDULER_INTERVAL_SECONDS', '300'))
+DUE_SOON_HOURS = int(os.environ.get('DUE_SOON_HOURS', '24'))
+DIGEST_HOUR_UTC = int(os.environ.get('DIGEST_HOUR_UTC', '8'))
+
+# Task ordering configuration
+RANK_MAX_LENGTH = int(os.environ.get('RANK_MAX_LENGTH', '12'))  # Longer keys schedule a column rebalance
+
+# Activity feed configuration
+ACTIVITY_STORE = os.environ.get('ACTIVITY_STORE', 'mongo')  # "mongo" (capped collection) or "memory"
+ACTIVITY_CAPPED_BYTES = int(os.environ.get('ACTIVITY_CAPPED_BYTES', str(64 * 1024 * 1024)))
+ACTIVITY_CAPPED_DOCS = int(os.environ.get('ACTIVITY_CAPPED_DOCS', '200000'))
+ACTIVITY_MEMORY_SIZE = int(os.environ.get('ACTIVITY_MEMORY_SIZE', '5000'))
+ACTIVITY_QUEUE_SIZE = int(os.environ.get('ACTIVITY_QUEUE_SIZE', '10000'))
+ACTIVITY_BATCH_SIZE = 100
+ACTIVITY_FOLLOW_WAIT_SECONDS = float(os.environ.get('ACTIVITY_FOLLOW_WAIT_SECONDS', '25'))
+ACTIVITY_TAIL_AWAIT_MS = 500
+# Sequence numbers are allocated before the insert, so another worker's batch can become visible first;
+# followers wait this long for a missing number before skipping it (e.g. a writer that failed)
+ACTIVITY_GAP_TIMEOUT_SECONDS = float(os.environ.get('ACTIVITY_GAP_TIMEOUT_SECONDS', '5'))
+ACTIVITY_IGNORED_FIELDS = {"updated_at", "password"}
+
+# Admission control configuration
+RATE_LIMIT_BURST = float(os.environ.get('RATE_LIMIT_BURST', '60'))
+RATE_LIMIT_REFILL_PER_SECOND = float(os.environ.get('RATE_LIMIT_REFILL_PER_SECOND', '10'))
+ROUTE_COST_DETAIL = 1
+ROUTE_COST_WRITE = 2
+ROUTE_COST_LIST = 5
+ROUTE_COST_STATS = 10
+ROUTE_COST_BOOTSTRAP = 10
+ROUTE_COST_CAPACITY = 10
+MAX_CONCURRENT_REQUESTS = int(os.environ.get('MAX_CONCURRENT_REQUESTS', '64'))
+QUEUE_LATENCY_BUDGET_MS = float(os.environ.get('QUEUE_LATENCY_BUDGET_MS', '250'))
+# Long-poll requests sit idle for most of their lifetime and would starve the concurrency slots;
+# probes must answer even when the API is shedding load
+ADMISSION_EXEMPT_PATHS = {"/api/activity/follow", "/api/health/ready"}
+
+# Application lifecycle
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Connect, prepare the database and warm up before serving; stop workers and disconnect after"""
+    global client, db
+    app.state.warmed_up = False
+    client = create_mongo_client()
+    db = client[os.environ['DB_NAME']]
+    await create_indexes()
+    await warm_up()
+    if JOB_WORKERS > 0:
+        job_queue.start()
+    activity_log.start()
+    app.state.warmed_up = True
+    try:
+        yield
+    finally:
+        app.state.warmed_up = False
+        await job_queue.stop()
+        await activity_log.stop()
+        client.close()
 
 # Create the main app without a prefix
-app = FastAPI(title="Marketing Consultancy Demand Management API")
+app = FastAPI(title="Marketing Consultancy Demand Management API", lifespan=lifespan)
+
+# Response encoding
+_wants_msgpack: ContextVar[bool] = ContextVar("wants_msgpack", default=False)
+
+def parse_accept_header(value: str) -> List[str]:
+    """Return the media types or codings of an Accept* header that are not refused (q=0)"""
+    accepted = []
+    for part in value.split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, param_value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(param_value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.append(token)
+    return accepted
+
+# Timezone-aware datetimes as pydantic renders them for JSON
+_ISO_DATETIME = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d{1,6})?(Z|[+-]\d{2}:\d{2})\Z")
+
+def msgpack_compact(value):
+    """Re-shape JSON-ready content for MessagePack: ISO datetimes become Timestamp extensions and
+    lists of objects sharing their keys become MSGPACK_EXT_TABLE extensions, so keys go out once per list"""
+    if isinstance(value, str):
+        if len(value) >= 20 and _ISO_DATETIME.match(value):
+            return msgpack.Timestamp.from_datetime(datetime.fromisoformat(value))
+        return value
+    if isinstance(value, dict):
+        return {key: msgpack_compact(item) for key, item in value.items()}
+    if isinstance(value, list):
+        if len(value) > 1 and all(isinstance(item, dict) for item in value):
+            columns = list(value[0])
+            if all(list(item) == columns for item in value):
+                rows = [[msgpack_compact(cell) for cell in item.values()] for item in value]
+                return msgpack.ExtType(MSGPACK_EXT_TABLE, msgpack.packb([columns, rows], use_bin_type=True))
+        return [msgpack_compact(item) for item in value]
+    return value
+
+def msgpack_ext_hook(code: int, data: bytes):
+    """`ext_hook` for clients: `msgpack.unpackb(body, timestamp=3, ext_hook=msgpack_ext_hook)` restores
+    the JSON shape, with datetimes instead of ISO strings"""
+    if code == MSGPACK_EXT_TABLE:
+        columns, rows = msgpack.unpackb(data, timestamp=3, ext_hook=msgpack_ext_hook)
+        return [dict(zip(columns, row)) for row in rows]
+    return msgpack.ExtType(code, data)
+
+class NegotiatedResponse(JSONResponse):
+    """JSON response that is rendered as compact MessagePack (see msgpack_compact) when the client asked for it"""
+
+    def render(self, content) -> bytes:
+        if msgpack is not None and _wants_msgpack.get():
+            self.media_type = MSGPACK_MEDIA_TYPE
+            return msgpack.packb(msgpack_compact(content), use_bin_type=True)
+        return super().render(content)
+
+class ContentNegotiationMiddleware:
+    """Flag requests sending `Accept: application/msgpack` so API responses are encoded in MessagePack"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or msgpack is None:
+            await self.app(scope, receive, send)
+            return
+
+        accepted = parse_accept_header(Headers(scope=scope).get("accept", ""))
+        token = _wants_msgpack.set(MSGPACK_MEDIA_TYPE in accepted)
+
+        async def send_with_vary(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(raw=message["headers"]).add_vary_header("Accept")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_vary)
+        finally:
+            _wants_msgpack.reset(token)
+
+class CompressionMiddleware:
+    """Compress response bodies larger than `minimum_size` with brotli (preferred) or gzip"""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = parse_accept_header(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            encoding = "br"
+        elif "gzip" in accepted:
+            encoding = "gzip"
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        streaming = False
+
+        async def send_compressed(message):
+            nonlocal start_message, streaming
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or streaming:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start_message["headers"])
+            if message.get("more_body", False):
+                # Streamed responses (e.g. follow mode) are passed through as-is
+                streaming = True
+                await send(start_message)
+                await send(message)
+                return
+
+            if len(body) >= self.minimum_size and "content-encoding" not in headers:
+                if encoding == "br":
+                    body = brotli.compress(body, quality=BROTLI_QUALITY)
+                else:
+                    body = gzip.compress(body, compresslevel=GZIP_COMPRESS_LEVEL)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
 
 # Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+api_router = APIRouter(prefix="/api", default_response_class=NegotiatedResponse, route_class=TracedRoute)
 
 # Security
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 # Enums
 class TaskStatus(str, Enum):
@@ -74,6 +701,39 @@ class UserRole(str, Enum):
     DESIGNER = "designer"
     ANALYST = "analyst"
 
+class CapacityBucket(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    LEASED = "leased"
+    DONE = "done"
+    DEAD = "dead"
+
+class JobKind(str, Enum):
+    NOTIFICATION = "notification"
+    DIGEST = "digest"
+    RANK_REBALANCE = "rank_rebalance"
+
+class ActivityAction(str, Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    ASSIGNED = "assigned"
+    UNASSIGNED = "unassigned"
+    DELETED = "deleted"
+
+class ActivityEntity(str, Enum):
+    CAMPAIGN = "campaign"
+    TASK = "task"
+    TEAM_MEMBER = "team_member"
+    CAMPAIGN_TEMPLATE = "campaign_template"
+
+class BootstrapView(str, Enum):
+    DASHBOARD = "dashboard"
+    TEAM = "team"
+    QUICK_ASSIGN = "quick_assign"
+
 # Models
 class User(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -83,6 +743,9 @@ class User(BaseModel):
     avatar_url: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     is_active: bool = True
+    weekly_capacity_hours: float = 40.0
+    workspace_id: str = DEFAULT_WORKSPACE_ID
+    version: int = 1
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -97,6 +760,10 @@ class UserLogin(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class Campaign(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -110,8 +777,10 @@ class Campaign(BaseModel):
     end_date: Optional[datetime] = None
     assigned_team: List[str] = []  # User IDs
     created_by: str  # User ID
+    workspace_id: str = DEFAULT_WORKSPACE_ID
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    version: int = 1
 
 class CampaignCreate(BaseModel):
     title: str
@@ -135,9 +804,12 @@ class Task(BaseModel):
     estimated_hours: Optional[float] = None
     actual_hours: Optional[float] = None
     dependencies: List[str] = []  # Task IDs
+    rank: Optional[str] = None  # Position within its (campaign, status) column, see rank_between
     created_by: str  # User ID
+    workspace_id: str = DEFAULT_WORKSPACE_ID
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    version: int = 1
 
 class TaskCreate(BaseModel):
     title: str
@@ -159,6 +831,100 @@ class TaskUpdate(BaseModel):
     estimated_hours: Optional[float] = None
     actual_hours: Optional[float] = None
 
+class TaskMove(BaseModel):
+    status: Optional[TaskStatus] = None  # Target column; defaults to the task's current status
+    after_id: Optional[str] = None  # Card that ends up directly above; None for the top
+    before_id: Optional[str] = None  # Card that ends up directly below; None for the bottom
+
+class TaskColumnPage(BaseModel):
+    tasks: List[Task]
+    cursor: Optional[str] = None
+
+# Longest allowed depends_on chain in a campaign template
+TEMPLATE_MAX_DEPENDENCY_DEPTH = 100
+
+class TaskBlueprint(BaseModel):
+    key: str  # Unique within the template, referenced by depends_on
+    title: str
+    description: Optional[str] = None
+    priority: TaskPriority = TaskPriority.MEDIUM
+    due_offset_days: int = 0  # Days after the campaign start date
+    estimated_hours: Optional[float] = None
+    assignee_role: Optional[UserRole] = None
+    depends_on: List[str] = []  # Blueprint keys
+
+class CampaignTemplate(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    name: str
+    description: Optional[str] = None
+    campaign_type: CampaignType
+    tasks: List[TaskBlueprint] = []
+    created_by: str  # User ID
+    workspace_id: str = DEFAULT_WORKSPACE_ID
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class CampaignTemplateCreate(BaseModel):
+    name: str
+    description: Optional[str] = None
+    campaign_type: CampaignType
+    tasks: List[TaskBlueprint] = []
+
+class TemplateInstantiate(BaseModel):
+    title: str
+    client_name: str
+    description: Optional[str] = None
+    budget: Optional[float] = None
+    start_date: Optional[datetime] = None  # Defaults to now
+    end_date: Optional[datetime] = None  # Defaults to the latest task due date
+    assigned_team: List[str] = []  # User IDs, matched against blueprint assignee roles
+    assignees: Dict[UserRole, str] = {}  # Explicit role -> user ID overrides
+
+class TemplateInstantiation(BaseModel):
+    campaign: Campaign
+    tasks: List[Task]
+
+class MemberCapacity(BaseModel):
+    user_id: str
+    name: str
+    role: UserRole
+    load_hours: List[float]  # One entry per bucket
+    capacity_hours: List[float]
+    overbooked_buckets: int
+
+class CapacityTimeline(BaseModel):
+    bucket: CapacityBucket
+    buckets: List[date]  # First day of each bucket within the requested range
+    members: List[MemberCapacity]
+
+class ActivityEntry(BaseModel):
+    id: str  # Also the cursor for paging and following the feed
+    action: ActivityAction
+    entity_type: ActivityEntity
+    entity_id: str
+    campaign_id: Optional[str] = None
+    actor_id: str
+    user_ids: List[str] = []  # The actor plus every member the change concerns
+    changes: dict = {}
+    at: datetime
+
+class ActivityPage(BaseModel):
+    entries: List[ActivityEntry]
+    cursor: Optional[str] = None
+
+# Capacity planning
+MAX_CAPACITY_RANGE_DAYS = 366
+WORKING_DAYS_PER_WEEK = 5
+
+# Bootstrap projections: only the fields each screen renders
+DASHBOARD_RECENT_CAMPAIGNS = 5
+DASHBOARD_RECENT_TASKS = 8
+DASHBOARD_CAMPAIGN_FIELDS = {"id": 1, "title": 1, "client_name": 1, "status": 1, "campaign_type": 1, "end_date": 1}
+DASHBOARD_TASK_FIELDS = {"id": 1, "title": 1, "status": 1, "priority": 1, "due_date": 1}
+QUICK_ASSIGN_CAMPAIGN_FIELDS = {"id": 1, "title": 1, "client_name": 1, "status": 1}
+TEAM_MEMBER_FIELDS = {"password": 0}
+WORKLOAD_TASK_FIELDS = {"id": 1, "assignee_id": 1, "status": 1, "due_date": 1, "estimated_hours": 1}
+
 # Helper functions
 def hash_password(password: str) -> str:
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
@@ -166,6 +932,92 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
+# Workspaces
+def database_for_workspace(workspace_id: str):
+    """Where a workspace's data lives.
+
+    Everything shares one database today, with workspace_id leading every index so it can also
+    serve as the shard key. Moving tenants to their own databases only needs a change here.
+    """
+    return db
+
+class WorkspaceCollection:
+    """A collection whose reads and writes are confined to one workspace"""
+
+    def __init__(self, collection, workspace_id: str):
+        self.collection = collection
+        self.workspace_id = workspace_id
+
+    def scope(self, query: Optional[dict] = None) -> dict:
+        # Applied last so a caller-supplied workspace_id can never widen the scope
+        return {**(query or {}), "workspace_id": self.workspace_id}
+
+    def find(self, query: Optional[dict] = None, *args, **kwargs):
+        return self.collection.find(self.scope(query), *args, **kwargs)
+
+    async def find_one(self, query: Optional[dict] = None, *args, **kwargs):
+        return await self.collection.find_one(self.scope(query), *args, **kwargs)
+
+    async def find_one_and_update(self, query: dict, update: dict, *args, **kwargs):
+        return await self.collection.find_one_and_update(self.scope(query), update, *args, **kwargs)
+
+    async def find_one_and_delete(self, query: dict, *args, **kwargs):
+        return await self.collection.find_one_and_delete(self.scope(query), *args, **kwargs)
+
+    async def count_documents(self, query: dict, **kwargs):
+        return await self.collection.count_documents(self.scope(query), **kwargs)
+
+    async def distinct(self, key: str, query: Optional[dict] = None):
+        return await self.collection.distinct(key, self.scope(query))
+
+    def aggregate(self, pipeline: List[dict], **kwargs):
+        return self.collection.aggregate([{"$match": self.scope()}, *pipeline], **kwargs)
+
+    async def insert_one(self, document: dict, **kwargs):
+        return await self.collection.insert_one({**document, "workspace_id": self.workspace_id}, **kwargs)
+
+    async def insert_many(self, documents: List[dict], **kwargs):
+        return await self.collection.insert_many(
+            [{**document, "workspace_id": self.workspace_id} for document in documents], **kwargs
+        )
+
+    async def update_one(self, query: dict, update: dict, **kwargs):
+        return await self.collection.update_one(self.scope(query), update, **kwargs)
+
+    async def update_many(self, query: dict, update: dict, **kwargs):
+        return await self.collection.update_many(self.scope(query), update, **kwargs)
+
+    async def delete_one(self, query: dict, **kwargs):
+        return await self.collection.delete_one(self.scope(query), **kwargs)
+
+    async def delete_many(self, query: dict, **kwargs):
+        return await self.collection.delete_many(self.scope(query), **kwargs)
+
+    async def update_each(self, updates: List[tuple], **kwargs):
+        """Apply many (filter, update) pairs to single documents in one round trip"""
+        return await self.collection.bulk_write(
+            [UpdateOne(self.scope(query), update) for query, update in updates], **kwargs
+        )
+
+async def ensure_in_workspace(collection: WorkspaceCollection, ids: Iterable[Optional[str]], detail: str):
+    """Reject references to documents outside the workspace, such as another tenant's users"""
+    wanted = {document_id for document_id in ids if document_id}
+    if wanted and len(await collection.distinct("id", {"id": {"$in": list(wanted)}})) != len(wanted):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail
+        )
+
+class WorkspaceDatabase:
+    """Tenant collections (users, campaigns, tasks, ...) scoped to one workspace"""
+
+    def __init__(self, workspace_id: str):
+        self.workspace_id = workspace_id
+        self.database = database_for_workspace(workspace_id)
+
+    def __getattr__(self, name: str) -> WorkspaceCollection:
+        return WorkspaceCollection(self.database[name], self.workspace_id)
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -173,10 +1025,49 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def hash_refresh_token(token: str) -> str:
+    """Keyed digest of a refresh token; tokens are random so a cheap HMAC is enough, no bcrypt needed"""
+    return hmac.new(SECRET_KEY.encode('utf-8'), token.encode('utf-8'), hashlib.sha256).hexdigest()
+
+async def issue_refresh_token(user_id: str, workspace_id: str, family_id: Optional[str] = None) -> str:
+    """Store a new refresh token (hashed) and return its plaintext; rotations share the family of the first one"""
+    token = secrets.token_urlsafe(32)
+    now = datetime.now(timezone.utc)
+    await db.refresh_tokens.insert_one({
+        "token_hash": hash_refresh_token(token),
+        "user_id": user_id,
+        "workspace_id": workspace_id,
+        "family_id": family_id or str(uuid.uuid4()),
+        "used_at": None,
+        "created_at": now,
+        # Stored as a BSON date (not ISO string) so the TTL index can expire it
+        "expires_at": now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    })
+    return token
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    with trace_span("auth"):
+        user = await authenticate(credentials)
+
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.user_id = user.id
+        trace.workspace_id = user.workspace_id
+        trace.is_admin = user.role == UserRole.ADMIN
+        if trace.explicit and trace.is_admin:
+            trace.start_profiler()
+    return user
+
+async def get_workspace(current_user: User = Depends(get_current_user)) -> WorkspaceDatabase:
+    """The caller's workspace; every tenant query goes through it"""
+    return WorkspaceDatabase(current_user.workspace_id)
+
+async def authenticate(credentials: HTTPAuthorizationCredentials) -> User:
     try:
         payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
+        # Tokens issued before workspaces existed belong to the default workspace
+        workspace_id: str = payload.get("ws", DEFAULT_WORKSPACE_ID)
         if user_id is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -188,7 +1079,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             detail="Could not validate credentials"
         )
     
-    user = await db.users.find_one({"id": user_id})
+    user = await WorkspaceDatabase(workspace_id).users.find_one({"id": user_id})
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -196,6 +1087,101 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         )
     return User(**user)
 
+# Admission control
+class TokenBucketLimiter:
+    """In-process token buckets keyed by user id, evicting the least recently used keys"""
+
+    def __init__(self, burst: float, refill_per_second: float, max_keys: int = 10000):
+        self.burst = burst
+        self.refill_per_second = refill_per_second
+        self.max_keys = max_keys
+        self.buckets: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def consume(self, key: str, cost: float) -> float:
+        """Take `cost` tokens from the bucket; return 0 on success or the seconds until they are available"""
+        now = time.monotonic()
+        tokens, updated_at = self.buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated_at) * self.refill_per_second)
+
+        retry_after = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            retry_after = (cost - tokens) / self.refill_per_second
+
+        self.buckets[key] = (tokens, now)
+        if len(self.buckets) > self.max_keys:
+            # An evicted idle bucket would have refilled to full anyway
+            self.buckets.popitem(last=False)
+        return retry_after
+
+rate_limiter = TokenBucketLimiter(RATE_LIMIT_BURST, RATE_LIMIT_REFILL_PER_SECOND)
+
+def rate_limit(cost: float):
+    """Route dependency charging `cost` tokens to the authenticated user"""
+    async def check_rate_limit(current_user: User = Depends(get_current_user)):
+        retry_after = rate_limiter.consume(current_user.id, cost)
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+    return check_rate_limit
+
+class AdmissionControlMiddleware:
+    """Cap concurrent API requests and shed load when the expected queue wait exceeds the latency budget"""
+
+    def __init__(self, app, max_concurrent: int = MAX_CONCURRENT_REQUESTS,
+                 latency_budget_ms: float = QUEUE_LATENCY_BUDGET_MS):
+        self.app = app
+        self.max_concurrent = max_concurrent
+        self.latency_budget = latency_budget_ms / 1000
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.waiting = 0
+        self.avg_service_time = 0.05  # seconds, exponentially weighted
+
+    def expected_wait(self) -> float:
+        if not self.semaphore.locked():
+            return 0.0
+        return (self.waiting + 1) / self.max_concurrent * self.avg_service_time
+
+    async def reject(self, scope, receive, send, retry_after: float):
+        response = JSONResponse(
+            {"detail": "Server is overloaded, please retry later"},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+        await response(scope, receive, send)
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or not scope["path"].startswith("/api")
+                or scope["path"] in ADMISSION_EXEMPT_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        expected_wait = self.expected_wait()
+        if expected_wait > self.latency_budget:
+            await self.reject(scope, receive, send, expected_wait)
+            return
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), timeout=self.latency_budget)
+        except asyncio.TimeoutError:
+            await self.reject(scope, receive, send, self.expected_wait() or self.avg_service_time)
+            return
+        finally:
+            self.waiting -= 1
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.semaphore.release()
+            elapsed = time.monotonic() - started
+            self.avg_service_time = 0.9 * self.avg_service_time + 0.1 * elapsed
+
 def prepare_for_mongo(data):
     """Prepare data for MongoDB storage by converting datetime objects"""
     if isinstance(data, dict):
@@ -211,6 +1197,8 @@ def prepare_for_mongo(data):
 def parse_from_mongo(item):
     """Parse data from MongoDB by converting ISO strings back to datetime objects"""
     if isinstance(item, dict):
+        # Documents written before optimistic concurrency have no version yet
+        item.setdefault('version', 0)
         for key, value in item.items():
             if key in ['created_at', 'updated_at', 'start_date', 'end_date', 'due_date'] and isinstance(value, str):
                 try:
@@ -219,9 +1207,763 @@ def parse_from_mongo(item):
                     pass
     return item
 
+# Optimistic concurrency
+def etag_for(version: int) -> str:
+    return f'"{version}"'
+
+def parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """Return the document version expected by an If-Match header, or None for an unconditional write"""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid If-Match header"
+        )
+
+def versioned_filter(document_id: str, expected_version: Optional[int]) -> dict:
+    query = {"id": document_id}
+    if expected_version == 0:
+        query["version"] = {"$exists": False}
+    elif expected_version is not None:
+        query["version"] = expected_version
+    return query
+
+async def raise_for_failed_write(collection, document_id: str, expected_version: Optional[int], not_found_detail: str):
+    """Tell a version conflict (412) apart from a missing document (404); only runs when a write matched nothing"""
+    if expected_version is not None and await collection.count_documents({"id": document_id}, limit=1):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Document was modified by another request"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=not_found_detail
+    )
+
+async def versioned_update(collection, document_id: str, expected_version: Optional[int], update_data: dict,
+                           not_found_detail: str, projection: Optional[dict] = None,
+                           return_document: ReturnDocument = ReturnDocument.AFTER) -> dict:
+    """Apply `$set` and bump the version in a single round trip, returning the updated document
+    (or, with ReturnDocument.BEFORE, the one it replaced)"""
+    updated = await collection.find_one_and_update(
+        versioned_filter(document_id, expected_version),
+        {"$set": update_data, "$inc": {"version": 1}},
+        projection=projection,
+        return_document=return_document
+    )
+    if updated is None:
+        await raise_for_failed_write(collection, document_id, expected_version, not_found_detail)
+    return updated
+
+# Background jobs
+def as_utc(value: datetime) -> datetime:
+    """BSON dates come back naive (UTC) from pymongo"""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def new_job(kind: JobKind, payload: dict, workspace_id: str, user_id: Optional[str] = None,
+            run_at: Optional[datetime] = None, dedupe_key: Optional[str] = None) -> dict:
+    now = datetime.now(timezone.utc)
+    job = {
+        "id": str(uuid.uuid4()),
+        "kind": kind.value,
+        "workspace_id": workspace_id,
+        "user_id": user_id,
+        "payload": payload,
+        "status": JobStatus.PENDING.value,
+        "attempts": 0,
+        # BSON dates rather than ISO strings: compared by workers and expired by a TTL index
+        "run_at": run_at or now,
+        "created_at": now,
+    }
+    if dedupe_key:
+        job["dedupe_key"] = dedupe_key
+    return job
+
+async def enqueue_jobs(jobs: List[dict]):
+    """Insert jobs into the outbox; jobs whose dedupe_key is already queued are skipped"""
+    if not jobs:
+        return
+    try:
+        await db.jobs.insert_many(jobs, ordered=False)
+    except BulkWriteError as error:
+        if any(write_error["code"] != 11000 for write_error in error.details.get("writeErrors", [])):
+            raise
+
+async def enqueue_assignment_notifications(tasks: List[Task], assigned_by: User):
+    await enqueue_jobs([
+        new_job(
+            JobKind.NOTIFICATION,
+            {
+                "type": "task_assigned",
+                "task_id": task.id,
+                "title": task.title,
+                "campaign_id": task.campaign_id,
+                "due_date": task.due_date.isoformat() if task.due_date else None,
+                "assigned_by": assigned_by.name
+            },
+            workspace_id=assigned_by.workspace_id,
+            user_id=task.assignee_id,
+            # The version makes every assignment its own job, so reassigning back to someone still notifies
+            dedupe_key=f"task_assigned:{task.id}:{task.version}"
+        )
+        for task in tasks
+        if task.assignee_id and task.assignee_id != assigned_by.id
+    ])
+
+class LogNotificationSink:
+    """Writes notifications to the application log; the default for local development"""
+
+    async def deliver(self, user_id: str, notifications: List[dict]):
+        logger.info("Notifications for %s: %s", user_id, json.dumps(notifications, default=str))
+
+class FileNotificationSink:
+    """Appends one JSON line per delivered batch to a file"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def _append(self, line: str):
+        with self.path.open("a", encoding="utf-8") as file:
+            file.write(line + "\n")
+
+    async def deliver(self, user_id: str, notifications: List[dict]):
+        line = json.dumps({
+            "user_id": user_id,
+            "delivered_at": datetime.now(timezone.utc).isoformat(),
+            "notifications": notifications
+        }, default=str)
+        await asyncio.to_thread(self._append, line)
+
+def build_notification_sink(spec: str):
+    if spec.startswith("file:"):
+        return FileNotificationSink(spec[len("file:"):])
+    if spec == "log":
+        return LogNotificationSink()
+    raise ValueError(f"Unknown NOTIFICATION_SINK: {spec}")
+
+class JobQueue:
+    """Asyncio worker pool draining the Mongo-backed `jobs` outbox.
+
+    Workers claim a ready job with a lease, then lease the other ready jobs of the same kind and
+    user so deliveries are batched per user. Expired leases are reclaimed, failures are retried
+    with exponential backoff and end up `dead` after JOB_MAX_ATTEMPTS.
+    """
+
+    def __init__(self, sink, workers: int = JOB_WORKERS):
+        self.sink = sink
+        self.workers = workers
+        self.handlers: Dict[str, Callable[[List[dict]], Awaitable[None]]] = {}
+        self.stopping = asyncio.Event()
+        self.tasks: List[asyncio.Task] = []
+        # Counted per workspace so the admin metrics of one tenant don't reveal another's volume
+        self.processed: Counter = Counter()
+        self.failed: Counter = Counter()
+        self.batches: Counter = Counter()
+        self.digest_date: Optional[date] = None  # Last day this process enqueued digests for
+
+    def register(self, kind: JobKind, handler: Callable[[List[dict]], Awaitable[None]]):
+        self.handlers[kind.value] = handler
+
+    def start(self):
+        self.stopping.clear()
+        self.tasks = [asyncio.create_task(self.work()) for _ in range(self.workers)]
+        self.tasks.append(asyncio.create_task(self.schedule()))
+
+    async def stop(self):
+        self.stopping.set()
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    async def claim_batch(self) -> List[dict]:
+        now = datetime.now(timezone.utc)
+        lease_id = str(uuid.uuid4())
+        lease = {"$set": {
+            "status": JobStatus.LEASED.value,
+            "lease_id": lease_id,
+            "lease_until": now + timedelta(seconds=JOB_LEASE_SECONDS)
+        }, "$inc": {"attempts": 1}}
+
+        first = await db.jobs.find_one_and_update(
+            {"$or": [
+                {"status": JobStatus.PENDING.value, "run_at": {"$lte": now}},
+                {"status": JobStatus.LEASED.value, "lease_until": {"$lt": now}}
+            ]},
+            lease,
+            sort=[("run_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+        if first is None:
+            return []
+
+        if JOB_BATCH_SIZE > 1:
+            ready = {
+                "kind": first["kind"],
+                # Jobs without a user (rank rebalances) must not be batched across tenants
+                "workspace_id": first["workspace_id"],
+                "user_id": first["user_id"],
+                "status": JobStatus.PENDING.value,
+                "run_at": {"$lte": now}
+            }
+            siblings = await db.jobs.find(ready, {"_id": 0, "id": 1}).limit(JOB_BATCH_SIZE - 1).to_list(JOB_BATCH_SIZE - 1)
+            if siblings:
+                # Re-checking the status in the filter keeps a job from being leased twice
+                await db.jobs.update_many({**ready, "id": {"$in": [job["id"] for job in siblings]}}, lease)
+                return await db.jobs.find({"lease_id": lease_id}).to_list(JOB_BATCH_SIZE)
+        return [first]
+
+    async def process(self, jobs: List[dict]):
+        handler = self.handlers.get(jobs[0]["kind"])
+        now = datetime.now(timezone.utc)
+        try:
+            if handler is None:
+                raise RuntimeError(f"No handler registered for job kind {jobs[0]['kind']}")
+            await handler(jobs)
+        except Exception as error:
+            self.failed[jobs[0]["workspace_id"]] += len(jobs)
+            logger.exception("Job batch of %d %s job(s) failed", len(jobs), jobs[0]["kind"])
+            await asyncio.gather(*[self.retry_or_bury(job, error, now) for job in jobs])
+            return
+
+        await db.jobs.update_many(
+            {"id": {"$in": [job["id"] for job in jobs]}, "lease_id": jobs[0]["lease_id"]},
+            {"$set": {"status": JobStatus.DONE.value, "completed_at": now},
+             "$unset": {"lease_id": "", "lease_until": ""}}
+        )
+        self.processed[jobs[0]["workspace_id"]] += len(jobs)
+        self.batches[jobs[0]["workspace_id"]] += 1
+
+    async def retry_or_bury(self, job: dict, error: Exception, now: datetime):
+        update = {"last_error": str(error)}
+        if job["attempts"] >= JOB_MAX_ATTEMPTS:
+            update.update({"status": JobStatus.DEAD.value, "completed_at": now})
+        else:
+            delay = JOB_RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1)
+            update.update({
+                "status": JobStatus.PENDING.value,
+                "run_at": now + timedelta(seconds=delay * random.uniform(0.8, 1.2))
+            })
+        await db.jobs.update_one(
+            {"id": job["id"], "lease_id": job["lease_id"]},
+            {"$set": update, "$unset": {"lease_id": "", "lease_until": ""}}
+        )
+
+    async def work(self):
+        while not self.stopping.is_set():
+            try:
+                jobs = await self.claim_batch()
+                if jobs:
+                    await self.process(jobs)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job worker error")
+            try:
+                await asyncio.wait_for(self.stopping.wait(), timeout=JOB_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def schedule(self):
+        """Periodically enqueue due-soon reminders and daily digests; dedupe keys make it safe per process"""
+        while not self.stopping.is_set():
+            try:
+                await enqueue_due_soon_reminders()
+                now = datetime.now(timezone.utc)
+                if now.hour >= DIGEST_HOUR_UTC and self.digest_date != now.date():
+                    await enqueue_daily_digests(now.date())
+                    self.digest_date = now.date()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job scheduler error")
+            try:
+                await asyncio.wait_for(self.stopping.wait(), timeout=SCHEDULER_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def metrics(self, workspace_id: str) -> dict:
+        now = datetime.now(timezone.utc)
+        counts, oldest_ready = await asyncio.gather(
+            db.jobs.aggregate([
+                {"$match": {"workspace_id": workspace_id}},
+                {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+            ]).to_list(None),
+            db.jobs.find(
+                {"workspace_id": workspace_id, "status": JobStatus.PENDING.value, "run_at": {"$lte": now}},
+                {"_id": 0, "run_at": 1}
+            ).sort("run_at", 1).limit(1).to_list(1)
+        )
+        depth = {job_status.value: 0 for job_status in JobStatus}
+        depth.update({entry["_id"]: entry["count"] for entry in counts})
+        lag = (now - as_utc(oldest_ready[0]["run_at"])).total_seconds() if oldest_ready else 0.0
+        return {
+            "depth": depth,
+            "lag_seconds": round(lag, 3),
+            "workers": len([task for task in self.tasks[:self.workers] if not task.done()]),
+            "processed": self.processed[workspace_id],
+            "failed": self.failed[workspace_id],
+            "batches": self.batches[workspace_id]
+        }
+
+# The scheduler is control-plane work and deliberately scans across workspaces
+async def enqueue_due_soon_reminders():
+    now = datetime.now(timezone.utc)
+    tasks = await db.tasks.find(
+        {
+            "status": {"$ne": TaskStatus.COMPLETED.value},
+            "assignee_id": {"$ne": None},
+            "due_date": {"$gte": now.isoformat(), "$lte": (now + timedelta(hours=DUE_SOON_HOURS)).isoformat()}
+        },
+        {"_id": 0, "id": 1, "title": 1, "assignee_id": 1, "campaign_id": 1, "due_date": 1, "workspace_id": 1}
+    ).to_list(None)
+    await enqueue_jobs([
+        new_job(
+            JobKind.NOTIFICATION,
+            {"type": "task_due_soon", "task_id": task["id"], "title": task["title"],
+             "campaign_id": task["campaign_id"], "due_date": task["due_date"]},
+            workspace_id=task.get("workspace_id", DEFAULT_WORKSPACE_ID),
+            user_id=task["assignee_id"],
+            dedupe_key=f"task_due_soon:{task['id']}:{task['due_date']}"
+        )
+        for task in tasks
+    ])
+
+async def enqueue_daily_digests(day: date):
+    assignees = await db.tasks.aggregate([
+        {"$match": {"status": {"$ne": TaskStatus.COMPLETED.value}, "assignee_id": {"$ne": None}}},
+        {"$group": {"_id": {"workspace_id": "$workspace_id", "assignee_id": "$assignee_id"}}}
+    ]).to_list(None)
+    today = day.isoformat()
+    await enqueue_jobs([
+        new_job(
+            JobKind.DIGEST,
+            {"date": today},
+            workspace_id=entry["_id"].get("workspace_id") or DEFAULT_WORKSPACE_ID,
+            user_id=entry["_id"]["assignee_id"],
+            dedupe_key=f"digest:{entry['_id']['assignee_id']}:{today}"
+        )
+        for entry in assignees
+    ])
+
+async def deliver_notifications(jobs: List[dict]):
+    await job_queue.sink.deliver(jobs[0]["user_id"], [job["payload"] for job in jobs])
+
+async def deliver_digests(jobs: List[dict]):
+    """Digests are built at delivery time so they reflect the assignee's current open tasks"""
+    user_id = jobs[0]["user_id"]
+    workspace = WorkspaceDatabase(jobs[0].get("workspace_id", DEFAULT_WORKSPACE_ID))
+    tasks = await workspace.tasks.find(
+        {"assignee_id": user_id, "status": {"$ne": TaskStatus.COMPLETED.value}},
+        {"_id": 0, "id": 1, "title": 1, "status": 1, "priority": 1, "due_date": 1, "campaign_id": 1}
+    ).sort("due_date", 1).to_list(1000)
+    await job_queue.sink.deliver(user_id, [
+        {"type": "daily_digest", "date": job["payload"]["date"], "open_tasks": tasks} for job in jobs[-1:]
+    ])
+
+job_queue = JobQueue(build_notification_sink(NOTIFICATION_SINK))
+job_queue.register(JobKind.NOTIFICATION, deliver_notifications)
+job_queue.register(JobKind.DIGEST, deliver_digests)
+
+# Task ordering
+# Cards are ordered by a lexicographic key per (campaign, status) column. A move writes one key
+# strictly between its neighbours; keys only grow when cards keep landing in the same gap, and
+# past RANK_MAX_LENGTH a background job re-spaces the column.
+RANK_DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+def rank_between(lower: Optional[str], upper: Optional[str]) -> str:
+    """Shortest-ish key strictly between two keys (None means open-ended).
+
+    Keys never end in the zero digit, which guarantees there is always room below any key.
+    """
+    lower = lower or ""
+    if upper is not None:
+        prefix = 0
+        while prefix < len(upper) and (lower[prefix] if prefix < len(lower) else "0") == upper[prefix]:
+            prefix += 1
+        if prefix > 0:
+            return upper[:prefix] + rank_between(lower[prefix:], upper[prefix:])
+
+    low = RANK_DIGITS.index(lower[0]) if lower else 0
+    high = RANK_DIGITS.index(upper[0]) if upper is not None else len(RANK_DIGITS)
+    if high - low > 1:
+        # Appending is the common case (new cards go to the bottom), so step instead of halving
+        if upper is None and lower:
+            return RANK_DIGITS[low + 1]
+        return RANK_DIGITS[(low + high) // 2]
+    if upper is not None and len(upper) > 1:
+        return upper[0]
+    return RANK_DIGITS[low] + rank_between(lower[1:], None)
+
+def evenly_spaced_ranks(count: int) -> List[str]:
+    """`count` ascending keys of equal length with a full digit of headroom between neighbours"""
+    base = len(RANK_DIGITS)
+    length = 1
+    while base ** length < (count + 1) * base:
+        length += 1
+    step = base ** length // (count + 1)
+    ranks = []
+    for position in range(1, count + 1):
+        value, digits = step * position, []
+        for _ in range(length):
+            value, digit = divmod(value, base)
+            digits.append(RANK_DIGITS[digit])
+        ranks.append("".join(reversed(digits)).rstrip("0"))
+    return ranks
+
+async def column_end_rank(workspace: WorkspaceDatabase, campaign_id: str, task_status: str,
+                          exclude_id: Optional[str] = None) -> str:
+    """Key that places a card at the bottom of its column"""
+    query = {"campaign_id": campaign_id, "status": task_status}
+    if exclude_id:
+        query["id"] = {"$ne": exclude_id}
+    last = await workspace.tasks.find(query, {"_id": 0, "rank": 1}).sort("rank", -1).limit(1).to_list(1)
+    rank = rank_between(last[0].get("rank") if last else None, None)
+    if len(rank) > RANK_MAX_LENGTH:
+        # Appends step one digit at a time, so a busy column's bottom key grows until it is re-spaced
+        await enqueue_rank_rebalance(workspace.workspace_id, campaign_id, task_status)
+    return rank
+
+async def enqueue_rank_rebalance(workspace_id: str, campaign_id: str, task_status: str):
+    # One rebalance per column per minute is plenty; moves keep working while it is pending
+    minute = datetime.now(timezone.utc).strftime("%Y%m%d%H%M")
+    await enqueue_jobs([new_job(
+        JobKind.RANK_REBALANCE,
+        {"campaign_id": campaign_id, "status": task_status},
+        workspace_id=workspace_id,
+        dedupe_key=f"rank_rebalance:{workspace_id}:{campaign_id}:{task_status}:{minute}"
+    )])
+
+async def enqueue_rank_backfill():
+    """Schedule a rebalance for every column holding tasks created before ranks existed"""
+    columns = await db.tasks.aggregate([
+        {"$match": {"rank": {"$exists": False}}},
+        {"$group": {"_id": {"workspace_id": "$workspace_id", "campaign_id": "$campaign_id", "status": "$status"}}}
+    ]).to_list(None)
+    for column in columns:
+        await enqueue_rank_rebalance(
+            column["_id"].get("workspace_id") or DEFAULT_WORKSPACE_ID, column["_id"]["campaign_id"],
+            column["_id"]["status"]
+        )
+
+async def rebalance_ranks(jobs: List[dict]):
+    """Re-space each column named by the batch; cards moved meanwhile keep the key their move wrote"""
+    columns = {
+        (job.get("workspace_id", DEFAULT_WORKSPACE_ID), job["payload"]["campaign_id"], job["payload"]["status"])
+        for job in jobs
+    }
+    for workspace_id, campaign_id, task_status in columns:
+        workspace = WorkspaceDatabase(workspace_id)
+        tasks = await workspace.tasks.find(
+            {"campaign_id": campaign_id, "status": task_status}, {"_id": 0, "id": 1, "rank": 1}
+        ).sort([("rank", 1), ("created_at", 1), ("id", 1)]).to_list(None)
+        updates = [
+            ({"id": task["id"], "status": task_status, "rank": task.get("rank")}, {"$set": {"rank": rank}})
+            for task, rank in zip(tasks, evenly_spaced_ranks(len(tasks)))
+            if task.get("rank") != rank
+        ]
+        if updates:
+            await workspace.tasks.update_each(updates, ordered=False)
+
+job_queue.register(JobKind.RANK_REBALANCE, rebalance_ranks)
+
+# Activity feed
+def activity_entry(actor: User, action: ActivityAction, entity_type: ActivityEntity, entity_id: str,
+                   campaign_id: Optional[str] = None, user_ids: Iterable[Optional[str]] = (),
+                   changes: Optional[dict] = None) -> dict:
+    """Build an activity document; the store numbers it (`seq`), which orders the feed and doubles as the cursor"""
+    return {
+        "workspace_id": actor.workspace_id,
+        "action": action.value,
+        "entity_type": entity_type.value,
+        "entity_id": entity_id,
+        "campaign_id": campaign_id,
+        "actor_id": actor.id,
+        "user_ids": list(dict.fromkeys([actor.id, *[user_id for user_id in user_ids if user_id]])),
+        "changes": {k: v for k, v in (changes or {}).items() if k not in ACTIVITY_IGNORED_FIELDS},
+        "at": datetime.now(timezone.utc)
+    }
+
+def task_created_activity(actor: User, task: Task) -> List[dict]:
+    entries = [activity_entry(actor, ActivityAction.CREATED, ActivityEntity.TASK, task.id,
+                              campaign_id=task.campaign_id, user_ids=[task.assignee_id])]
+    if task.assignee_id:
+        entries.append(activity_entry(actor, ActivityAction.ASSIGNED, ActivityEntity.TASK, task.id,
+                                      campaign_id=task.campaign_id, user_ids=[task.assignee_id],
+                                      changes={"assignee_id": task.assignee_id}))
+    return entries
+
+def activity_query(workspace_id: str, campaign_id: Optional[str], user_id: Optional[str]) -> dict:
+    query = {"workspace_id": workspace_id}
+    if campaign_id:
+        query["campaign_id"] = campaign_id
+    if user_id:
+        query["user_ids"] = user_id
+    return query
+
+class MongoActivityStore:
+    """Capped `activity` collection: append-only, bounded, and tailable for follow mode.
+
+    Every uvicorn worker writes, so entries are numbered from a shared counter rather than by
+    client-side ObjectIds, whose order across processes is arbitrary within a second. One tailing
+    cursor per process collects new entries and only releases them to long-polls once every lower
+    number has arrived, so followers neither skip nor repeat entries from other workers.
+    """
+
+    def __init__(self, size: int = ACTIVITY_MEMORY_SIZE):
+        self.recent: deque = deque(maxlen=size)  # Released entries in seq order
+        self.pending: Dict[int, dict] = {}  # Arrived ahead of a missing seq
+        self.gap_since: Optional[float] = None
+        self.frontier = 0  # Every seq up to here has arrived (or was given up on)
+        # Entries after this seq are in `recent`; None until the tailer has started
+        self.floor: Optional[int] = None
+        self.released: Optional[asyncio.Condition] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self.released = asyncio.Condition()
+        self.task = asyncio.create_task(self.tail())
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+        self.task = None
+        self.floor = None
+
+    async def tail(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            cursor = None
+            try:
+                if self.floor is None:
+                    # Start from the newest entry; anything older is served from the collection
+                    latest = await db.activity.find({}, {"_id": 0, "seq": 1}).sort("$natural", -1).limit(1).to_list(1)
+                    self.frontier = self.floor = latest[0].get("seq", 0) if latest else 0
+                cursor = db.activity.find(
+                    {"seq": {"$gt": self.frontier}},
+                    cursor_type=CursorType.TAILABLE_AWAIT,
+                    max_await_time_ms=ACTIVITY_TAIL_AWAIT_MS
+                )
+                while cursor.alive:
+                    try:
+                        entry = await cursor.next()
+                    except StopAsyncIteration:
+                        entry = None
+                    if entry is not None and entry["seq"] > self.frontier:
+                        self.pending[entry["seq"]] = entry
+                    if self.gap_since is not None and loop.time() - self.gap_since > ACTIVITY_GAP_TIMEOUT_SECONDS:
+                        logger.warning("Activity entries %d-%d never arrived, skipping them",
+                                       self.frontier + 1, min(self.pending) - 1)
+                        self.frontier = min(self.pending) - 1
+                    await self.release(loop.time())
+            except Exception:
+                logger.exception("Activity tailer failed, reopening")
+            finally:
+                if cursor is not None:
+                    await cursor.close()
+            # A tailable cursor on an empty collection is dead on arrival; back off and reopen
+            await asyncio.sleep(ACTIVITY_TAIL_AWAIT_MS / 1000)
+
+    async def release(self, now: float):
+        """Move the contiguous run after the frontier from `pending` to `recent` and wake followers"""
+        frontier = self.frontier
+        while self.frontier + 1 in self.pending:
+            if len(self.recent) == self.recent.maxlen:
+                self.floor = self.recent[0]["seq"]
+            self.frontier += 1
+            self.recent.append(self.pending.pop(self.frontier))
+        if not self.pending:
+            self.gap_since = None
+        elif self.gap_since is None or self.frontier != frontier:
+            self.gap_since = now
+        if self.frontier != frontier:
+            async with self.released:
+                self.released.notify_all()
+
+    async def insert(self, entries: List[dict]):
+        counter = await db.counters.find_one_and_update(
+            {"_id": "activity"}, {"$inc": {"seq": len(entries)}}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        first = counter["seq"] - len(entries) + 1
+        for offset, entry in enumerate(entries):
+            entry["seq"] = first + offset
+        await db.activity.insert_many(entries)
+
+    async def head(self) -> int:
+        if self.floor is not None:
+            return self.frontier
+        latest = await db.activity.find({}, {"_id": 0, "seq": 1}).sort("$natural", -1).limit(1).to_list(1)
+        return latest[0].get("seq", 0) if latest else 0
+
+    async def history(self, query: dict, before: Optional[int], limit: int) -> List[dict]:
+        query = {**query, "seq": {"$lt": before} if before is not None else {"$exists": True}}
+        return await db.activity.find(query).sort("seq", -1).limit(limit).to_list(limit)
+
+    async def follow(self, query: dict, after: int, wait: float, limit: int) -> List[dict]:
+        if self.floor is None or after < self.floor:
+            # The cursor predates the ring: catch up from the collection through the feed indexes
+            seq = {"$gt": after} if self.floor is None else {"$gt": after, "$lte": self.frontier}
+            entries = await db.activity.find({**query, "seq": seq}).sort("seq", 1).limit(limit).to_list(limit)
+            if entries or self.floor is None:
+                return entries
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        async with self.released:
+            while True:
+                entries = [
+                    entry for entry in self.recent
+                    if entry["seq"] > after and MemoryActivityStore.matches(entry, query)
+                ]
+                remaining = deadline - loop.time()
+                if entries or remaining <= 0:
+                    return entries[:limit]
+                try:
+                    await asyncio.wait_for(self.released.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    return []
+
+class MemoryActivityStore:
+    """Bounded in-process ring for local development; history does not survive a restart"""
+
+    def __init__(self, size: int = ACTIVITY_MEMORY_SIZE):
+        self.entries: deque = deque(maxlen=size)
+        self.seq = 0
+        self.appended: Optional[asyncio.Condition] = None
+
+    def condition(self) -> asyncio.Condition:
+        # Created lazily so it belongs to the serving event loop
+        if self.appended is None:
+            self.appended = asyncio.Condition()
+        return self.appended
+
+    def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    @staticmethod
+    def matches(entry: dict, query: dict) -> bool:
+        return all(
+            value in entry[field] if isinstance(entry[field], list) else entry[field] == value
+            for field, value in query.items()
+        )
+
+    async def insert(self, entries: List[dict]):
+        async with self.condition():
+            for entry in entries:
+                self.seq += 1
+                entry["seq"] = self.seq
+            self.entries.extend(entries)
+            self.condition().notify_all()
+
+    async def head(self) -> int:
+        return self.seq
+
+    async def history(self, query: dict, before: Optional[int], limit: int) -> List[dict]:
+        results = []
+        for entry in reversed(self.entries):
+            if len(results) == limit:
+                break
+            if (before is None or entry["seq"] < before) and self.matches(entry, query):
+                results.append(entry)
+        return results
+
+    async def follow(self, query: dict, after: int, wait: float, limit: int) -> List[dict]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        async with self.condition():
+            while True:
+                entries = [entry for entry in self.entries if entry["seq"] > after and self.matches(entry, query)]
+                remaining = deadline - loop.time()
+                if entries or remaining <= 0:
+                    return entries[:limit]
+                try:
+                    await asyncio.wait_for(self.condition().wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    return []
+
+def build_activity_store(spec: str):
+    if spec == "mongo":
+        return MongoActivityStore()
+    if spec == "memory":
+        return MemoryActivityStore()
+    raise ValueError(f"Unknown ACTIVITY_STORE: {spec}")
+
+class ActivityLog:
+    """Fire-and-forget activity writer.
+
+    Routes hand entries over without awaiting anything; a single task drains the queue and writes
+    batches in order. When the queue is full entries are dropped and counted rather than slowing
+    the mutation down.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+    def record(self, *entries: dict):
+        if self.queue is None:
+            return
+        for entry in entries:
+            try:
+                self.queue.put_nowait(entry)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                logger.warning("Activity queue full, dropped %s %s entry (%d dropped so far)",
+                               entry["action"], entry["entity_type"], self.dropped)
+
+    def start(self):
+        self.queue = asyncio.Queue(maxsize=ACTIVITY_QUEUE_SIZE)
+        self.task = asyncio.create_task(self.write())
+        self.store.start()
+
+    async def stop(self):
+        """Flush queued entries, then stop the writer"""
+        if self.task is None:
+            return
+        await self.queue.join()
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+        await self.store.stop()
+        self.queue = None
+        self.task = None
+
+    async def write(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < ACTIVITY_BATCH_SIZE and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                await self.store.insert(batch)
+            except Exception:
+                logger.exception("Failed to write %d activity entries", len(batch))
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+activity_log = ActivityLog(build_activity_store(ACTIVITY_STORE))
+
 # Authentication Routes
 @api_router.post("/auth/register", response_model=User)
-async def register(user_data: UserCreate):
+async def register(user_data: UserCreate,
+                   credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)):
+    # Members added by a signed-in user join that user's workspace. An open sign-up founds a new
+    # workspace and administers it; existing tenants are only reachable by invitation.
+    caller = await authenticate(credentials) if credentials is not None else None
+    workspace_id = caller.workspace_id if caller else str(uuid.uuid4())
+
     # Check if user already exists
     existing_user = await db.users.find_one({"email": user_data.email})
     if existing_user:
@@ -235,7 +1977,8 @@ async def register(user_data: UserCreate):
     user = User(
         email=user_data.email,
         name=user_data.name,
-        role=user_data.role
+        role=user_data.role if caller else UserRole.ADMIN,
+        workspace_id=workspace_id
     )
     
     user_dict = user.dict()
@@ -243,6 +1986,8 @@ async def register(user_data: UserCreate):
     user_dict = prepare_for_mongo(user_dict)
     
     await db.users.insert_one(user_dict)
+    activity_log.record(activity_entry(caller or user, ActivityAction.CREATED, ActivityEntity.TEAM_MEMBER, user.id,
+                                       user_ids=[user.id]))
     return user
 
 @api_router.post("/auth/login", response_model=Token)
@@ -254,166 +1999,694 @@ async def login(user_credentials: UserLogin):
             detail="Incorrect email or password"
         )
     
-    access_token = create_access_token(data={"sub": user["id"]})
-    return {"access_token": access_token, "token_type": "bearer"}
+    workspace_id = user.get("workspace_id", DEFAULT_WORKSPACE_ID)
+    access_token = create_access_token(data={"sub": user["id"], "ws": workspace_id})
+    refresh_token = await issue_refresh_token(user["id"], workspace_id)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+@api_router.post("/auth/refresh", response_model=Token)
+async def refresh_session(refresh_data: RefreshRequest):
+    token_hash = hash_refresh_token(refresh_data.refresh_token)
+    now = datetime.now(timezone.utc)
+
+    # Marking the token used in the same indexed lookup makes rotation atomic
+    stored = await db.refresh_tokens.find_one_and_update(
+        {"token_hash": token_hash, "used_at": None, "expires_at": {"$gt": now}},
+        {"$set": {"used_at": now}}
+    )
+    if stored is None:
+        # A rotated token being presented again means it leaked: revoke the whole family
+        reused = await db.refresh_tokens.find_one(
+            {"token_hash": token_hash, "used_at": {"$ne": None}},
+            {"family_id": 1}
+        )
+        if reused:
+            await db.refresh_tokens.delete_many({"family_id": reused["family_id"]})
+            logger.warning("Refresh token reuse detected, revoked token family %s", reused["family_id"])
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token"
+        )
 
-@api_router.get("/auth/me", response_model=User)
+    workspace_id = stored.get("workspace_id", DEFAULT_WORKSPACE_ID)
+    access_token = create_access_token(data={"sub": stored["user_id"], "ws": workspace_id})
+    refresh_token = await issue_refresh_token(stored["user_id"], workspace_id, stored["family_id"])
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+@api_router.post("/auth/logout")
+async def logout(refresh_data: RefreshRequest):
+    stored = await db.refresh_tokens.find_one(
+        {"token_hash": hash_refresh_token(refresh_data.refresh_token)},
+        {"family_id": 1}
+    )
+    if stored:
+        await db.refresh_tokens.delete_many({"family_id": stored["family_id"]})
+    return {"message": "Logged out successfully"}
+
+@api_router.get("/auth/me", response_model=User, dependencies=[Depends(rate_limit(ROUTE_COST_DETAIL))])
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
     return current_user
 
 # Campaign Routes
-@api_router.post("/campaigns", response_model=Campaign)
-async def create_campaign(campaign_data: CampaignCreate, current_user: User = Depends(get_current_user)):
+@api_router.post("/campaigns", response_model=Campaign, dependencies=[Depends(rate_limit(ROUTE_COST_WRITE))])
+async def create_campaign(campaign_data: CampaignCreate, current_user: User = Depends(get_current_user),
+                          workspace: WorkspaceDatabase = Depends(get_workspace)):
+    await ensure_in_workspace(workspace.users, campaign_data.assigned_team, "Unknown team member in assigned_team")
     campaign = Campaign(
         **campaign_data.dict(),
-        created_by=current_user.id
+        created_by=current_user.id,
+        workspace_id=workspace.workspace_id
     )
     
     campaign_dict = prepare_for_mongo(campaign.dict())
-    await db.campaigns.insert_one(campaign_dict)
+    await workspace.campaigns.insert_one(campaign_dict)
+    activity_log.record(activity_entry(current_user, ActivityAction.CREATED, ActivityEntity.CAMPAIGN, campaign.id,
+                                       campaign_id=campaign.id, user_ids=campaign.assigned_team))
     return campaign
 
-@api_router.get("/campaigns", response_model=List[Campaign])
-async def get_campaigns(current_user: User = Depends(get_current_user)):
-    campaigns = await db.campaigns.find().to_list(1000)
-    return [Campaign(**parse_from_mongo(campaign)) for campaign in campaigns]
+@api_router.get("/campaigns", response_model=List[Campaign], dependencies=[Depends(rate_limit(ROUTE_COST_LIST))])
+async def get_campaigns(workspace: WorkspaceDatabase = Depends(get_workspace)):
+    campaigns = await workspace.campaigns.find().to_list(1000)
+    with trace_span("pydantic", model="Campaign", count=len(campaigns)):
+        return [Campaign(**parse_from_mongo(campaign)) for campaign in campaigns]
 
-@api_router.get("/campaigns/{campaign_id}", response_model=Campaign)
-async def get_campaign(campaign_id: str, current_user: User = Depends(get_current_user)):
-    campaign = await db.campaigns.find_one({"id": campaign_id})
+@api_router.get("/campaigns/{campaign_id}", response_model=Campaign, dependencies=[Depends(rate_limit(ROUTE_COST_DETAIL))])
+async def get_campaign(campaign_id: str, response: Response, workspace: WorkspaceDatabase = Depends(get_workspace)):
+    campaign = await workspace.campaigns.find_one({"id": campaign_id})
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Campaign not found"
         )
-    return Campaign(**parse_from_mongo(campaign))
+    campaign = Campaign(**parse_from_mongo(campaign))
+    response.headers["ETag"] = etag_for(campaign.version)
+    return campaign
 
-@api_router.put("/campaigns/{campaign_id}", response_model=Campaign)
-async def update_campaign(campaign_id: str, campaign_data: CampaignCreate, current_user: User = Depends(get_current_user)):
-    campaign = await db.campaigns.find_one({"id": campaign_id})
-    if not campaign:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Campaign not found"
-        )
-    
+@api_router.put("/campaigns/{campaign_id}", response_model=Campaign, dependencies=[Depends(rate_limit(ROUTE_COST_WRITE))])
+async def update_campaign(campaign_id: str, campaign_data: CampaignCreate, response: Response,
+                          if_match: Optional[str] = Header(None), current_user: User = Depends(get_current_user),
+                          workspace: WorkspaceDatabase = Depends(get_workspace)):
+    await ensure_in_workspace(workspace.users, campaign_data.assigned_team, "Unknown team member in assigned_team")
     update_data = campaign_data.dict()
     update_data["updated_at"] = datetime.now(timezone.utc)
     update_data = prepare_for_mongo(update_data)
     
-    await db.campaigns.update_one({"id": campaign_id}, {"$set": update_data})
-    
-    updated_campaign = await db.campaigns.find_one({"id": campaign_id})
-    return Campaign(**parse_from_mongo(updated_campaign))
+    updated_campaign = await versioned_update(
+        workspace.campaigns, campaign_id, parse_if_match(if_match), update_data, "Campaign not found"
+    )
+    campaign = Campaign(**parse_from_mongo(updated_campaign))
+    activity_log.record(activity_entry(current_user, ActivityAction.UPDATED, ActivityEntity.CAMPAIGN, campaign.id,
+                                       campaign_id=campaign.id, changes=update_data))
+    response.headers["ETag"] = etag_for(campaign.version)
+    return campaign
 
 # Task Routes
-@api_router.post("/tasks", response_model=Task)
-async def create_task(task_data: TaskCreate, current_user: User = Depends(get_current_user)):
+@api_router.post("/tasks", response_model=Task, dependencies=[Depends(rate_limit(ROUTE_COST_WRITE))])
+async def create_task(task_data: TaskCreate, current_user: User = Depends(get_current_user),
+                      workspace: WorkspaceDatabase = Depends(get_workspace)):
     # Verify campaign exists
-    campaign = await db.campaigns.find_one({"id": task_data.campaign_id})
+    campaign = await workspace.campaigns.find_one({"id": task_data.campaign_id})
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Campaign not found"
         )
+    await asyncio.gather(
+        ensure_in_workspace(workspace.users, [task_data.assignee_id], "Assignee not found"),
+        ensure_in_workspace(workspace.tasks, task_data.dependencies, "Unknown task in dependencies")
+    )
     
     task = Task(
         **task_data.dict(),
-        created_by=current_user.id
+        rank=await column_end_rank(workspace, task_data.campaign_id, TaskStatus.TODO.value),
+        created_by=current_user.id,
+        workspace_id=workspace.workspace_id
     )
     
     task_dict = prepare_for_mongo(task.dict())
-    await db.tasks.insert_one(task_dict)
+    await workspace.tasks.insert_one(task_dict)
+    activity_log.record(*task_created_activity(current_user, task))
+    await enqueue_assignment_notifications([task], current_user)
     return task
 
-@api_router.get("/tasks", response_model=List[Task])
-async def get_tasks(campaign_id: Optional[str] = None, current_user: User = Depends(get_current_user)):
+@api_router.get("/tasks", response_model=List[Task], dependencies=[Depends(rate_limit(ROUTE_COST_LIST))])
+async def get_tasks(campaign_id: Optional[str] = None, workspace: WorkspaceDatabase = Depends(get_workspace)):
     query = {}
     if campaign_id:
         query["campaign_id"] = campaign_id
     
-    tasks = await db.tasks.find(query).to_list(1000)
-    return [Task(**parse_from_mongo(task)) for task in tasks]
+    tasks = await workspace.tasks.find(query).to_list(1000)
+    with trace_span("pydantic", model="Task", count=len(tasks)):
+        return [Task(**parse_from_mongo(task)) for task in tasks]
 
-@api_router.get("/tasks/{task_id}", response_model=Task)
-async def get_task(task_id: str, current_user: User = Depends(get_current_user)):
-    task = await db.tasks.find_one({"id": task_id})
+@api_router.get("/tasks/{task_id}", response_model=Task, dependencies=[Depends(rate_limit(ROUTE_COST_DETAIL))])
+async def get_task(task_id: str, response: Response, workspace: WorkspaceDatabase = Depends(get_workspace)):
+    task = await workspace.tasks.find_one({"id": task_id})
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
-    return Task(**parse_from_mongo(task))
+    task = Task(**parse_from_mongo(task))
+    response.headers["ETag"] = etag_for(task.version)
+    return task
+
+@api_router.put("/tasks/{task_id}", response_model=Task, dependencies=[Depends(rate_limit(ROUTE_COST_WRITE))])
+async def update_task(task_id: str, task_data: TaskUpdate, response: Response,
+                      if_match: Optional[str] = Header(None), current_user: User = Depends(get_current_user),
+                      workspace: WorkspaceDatabase = Depends(get_workspace)):
+    update_data = {k: v for k, v in task_data.dict().items() if v is not None}
+    update_data["updated_at"] = datetime.now(timezone.utc)
+    update_data = prepare_for_mongo(update_data)
+    expected_version = parse_if_match(if_match)
+
+    # The edit form sends assignee_id on every save. Try the write assuming it is unchanged (it was
+    # validated when it was set); only a miss pays for checking a new assignee against the workspace.
+    previous = None
+    if "assignee_id" in update_data:
+        previous = await workspace.tasks.find_one_and_update(
+            {**versioned_filter(task_id, expected_version), "assignee_id": update_data["assignee_id"]},
+            {"$set": update_data, "$inc": {"version": 1}},
+            return_document=ReturnDocument.BEFORE
+        )
+        if previous is None:
+            await ensure_in_workspace(workspace.users, [update_data["assignee_id"]], "Assignee not found")
+    if previous is None:
+        # Only a different assignee counts as an assignment below
+        previous = await versioned_update(
+            workspace.tasks, task_id, expected_version, update_data, "Task not found",
+            return_document=ReturnDocument.BEFORE
+        )
+    task = Task(**parse_from_mongo({**previous, **update_data, "version": previous.get("version", 0) + 1}))
+    assignee_changed = task.assignee_id != previous.get("assignee_id")
+    if task.status.value != previous.get("status"):
+        # A card that changes column goes to the bottom of the new one; conditional on the rank it
+        # carried over so a concurrent move wins, and it only costs anything on real column changes
+        rank = await column_end_rank(workspace, task.campaign_id, task.status.value, exclude_id=task.id)
+        result = await workspace.tasks.update_one(
+            {"id": task.id, "status": task.status.value, "rank": task.rank}, {"$set": {"rank": rank}}
+        )
+        if result.modified_count:
+            task.rank = rank
+    activity_log.record(activity_entry(current_user, ActivityAction.UPDATED, ActivityEntity.TASK, task.id,
+                                       campaign_id=task.campaign_id, changes=update_data))
+    if assignee_changed:
+        activity_log.record(activity_entry(
+            current_user, ActivityAction.ASSIGNED if task.assignee_id else ActivityAction.UNASSIGNED,
+            ActivityEntity.TASK, task.id, campaign_id=task.campaign_id,
+            user_ids=[task.assignee_id, previous.get("assignee_id")],
+            changes={"assignee_id": task.assignee_id, "previous_assignee_id": previous.get("assignee_id")}
+        ))
+        await enqueue_assignment_notifications([task], current_user)
+    response.headers["ETag"] = etag_for(task.version)
+    return task
 
-@api_router.put("/tasks/{task_id}", response_model=Task)
-async def update_task(task_id: str, task_data: TaskUpdate, current_user: User = Depends(get_current_user)):
-    task = await db.tasks.find_one({"id": task_id})
+async def neighbour_rank(workspace: WorkspaceDatabase, campaign_id: str, task_status: str, neighbour_id: str) -> str:
+    neighbour = await workspace.tasks.find_one(
+        {"id": neighbour_id, "campaign_id": campaign_id, "status": task_status}, {"_id": 0, "rank": 1}
+    )
+    if not neighbour or not neighbour.get("rank"):
+        if neighbour:
+            await enqueue_rank_rebalance(workspace.workspace_id, campaign_id, task_status)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The column changed, reload it and try again"
+        )
+    return neighbour["rank"]
+
+async def adjacent_rank(workspace: WorkspaceDatabase, campaign_id: str, task_status: str, task_id: str,
+                        rank: str, below: bool) -> Optional[str]:
+    """Rank of the card right below (or above) `rank`, skipping the card being moved"""
+    adjacent = await workspace.tasks.find(
+        {"campaign_id": campaign_id, "status": task_status, "id": {"$ne": task_id},
+         "rank": {"$gt": rank} if below else {"$lt": rank}},
+        {"_id": 0, "rank": 1}
+    ).sort("rank", 1 if below else -1).limit(1).to_list(1)
+    return adjacent[0]["rank"] if adjacent else None
+
+@api_router.put("/tasks/{task_id}/position", response_model=Task, dependencies=[Depends(rate_limit(ROUTE_COST_WRITE))])
+async def move_task(task_id: str, move: TaskMove, response: Response, if_match: Optional[str] = Header(None),
+                    current_user: User = Depends(get_current_user), workspace: WorkspaceDatabase = Depends(get_workspace)):
+    """Move a card within or across status columns by writing one new rank between its new neighbours"""
+    task = await workspace.tasks.find_one({"id": task_id}, {"_id": 0, "campaign_id": 1, "status": 1})
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
-    
-    update_data = {k: v for k, v in task_data.dict().items() if v is not None}
-    update_data["updated_at"] = datetime.now(timezone.utc)
-    update_data = prepare_for_mongo(update_data)
-    
-    await db.tasks.update_one({"id": task_id}, {"$set": update_data})
-    
-    updated_task = await db.tasks.find_one({"id": task_id})
-    return Task(**parse_from_mongo(updated_task))
+    campaign_id = task["campaign_id"]
+    target_status = move.status.value if move.status else task["status"]
+
+    if task_id in (move.after_id, move.before_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A task cannot be its own neighbour"
+        )
+
+    if not move.after_id and not move.before_id:
+        rank = await column_end_rank(workspace, campaign_id, target_status, exclude_id=task_id)
+    else:
+        lower = await neighbour_rank(workspace, campaign_id, target_status, move.after_id) if move.after_id else None
+        if move.before_id:
+            upper = await neighbour_rank(workspace, campaign_id, target_status, move.before_id)
+        else:
+            upper = await adjacent_rank(workspace, campaign_id, target_status, task_id, lower, below=True)
+        if lower is None:
+            lower = await adjacent_rank(workspace, campaign_id, target_status, task_id, upper, below=False)
+        if lower is not None and upper is not None and lower >= upper:
+            # Stale neighbours or duplicate keys from concurrent moves; re-spacing the column fixes both
+            await enqueue_rank_rebalance(workspace.workspace_id, campaign_id, target_status)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="The column changed, reload it and try again"
+            )
+        rank = rank_between(lower, upper)
+
+    update_data = prepare_for_mongo({"status": target_status, "rank": rank, "updated_at": datetime.now(timezone.utc)})
+    updated_task = await versioned_update(
+        workspace.tasks, task_id, parse_if_match(if_match), update_data, "Task not found"
+    )
+    if len(rank) > RANK_MAX_LENGTH and (move.after_id or move.before_id):
+        # Moves to the bottom were already scheduled by column_end_rank
+        await enqueue_rank_rebalance(workspace.workspace_id, campaign_id, target_status)
+
+    task = Task(**parse_from_mongo(updated_task))
+    activity_log.record(activity_entry(current_user, ActivityAction.UPDATED, ActivityEntity.TASK, task.id,
+                                       campaign_id=task.campaign_id, changes={"status": target_status, "rank": rank}))
+    response.headers["ETag"] = etag_for(task.version)
+    return task
+
+@api_router.get("/campaigns/{campaign_id}/board/{column}", response_model=TaskColumnPage,
+                dependencies=[Depends(rate_limit(ROUTE_COST_LIST))])
+async def get_board_column(campaign_id: str, column: TaskStatus, after: Optional[str] = None,
+                           limit: int = Query(50, ge=1, le=200), workspace: WorkspaceDatabase = Depends(get_workspace)):
+    """One Kanban column in rank order; pass `cursor` back as `after` for the next page"""
+    query = {"campaign_id": campaign_id, "status": column.value}
+    if after:
+        rank, _, task_id = after.partition(":")
+        if not task_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid column cursor"
+            )
+        if rank:
+            query["$or"] = [{"rank": {"$gt": rank}}, {"rank": rank, "id": {"$gt": task_id}}]
+        else:
+            # Cards not yet backfilled have no rank and sort first; page through them by id
+            query["$or"] = [{"rank": None, "id": {"$gt": task_id}}, {"rank": {"$type": "string"}}]
 
-@api_router.delete("/tasks/{task_id}")
-async def delete_task(task_id: str, current_user: User = Depends(get_current_user)):
-    result = await db.tasks.delete_one({"id": task_id})
+    tasks = await workspace.tasks.find(query).sort([("rank", 1), ("id", 1)]).limit(limit).to_list(limit)
+    tasks = [Task(**parse_from_mongo(task)) for task in tasks]
+    return TaskColumnPage(
+        tasks=tasks,
+        cursor=f"{tasks[-1].rank or ''}:{tasks[-1].id}" if len(tasks) == limit else None
+    )
+
+@api_router.delete("/tasks/{task_id}", dependencies=[Depends(rate_limit(ROUTE_COST_WRITE))])
+async def delete_task(task_id: str, if_match: Optional[str] = Header(None),
+                      current_user: User = Depends(get_current_user), workspace: WorkspaceDatabase = Depends(get_workspace)):
+    expected_version = parse_if_match(if_match)
+    deleted = await workspace.tasks.find_one_and_delete(
+        versioned_filter(task_id, expected_version), projection={"_id": 0, "campaign_id": 1, "assignee_id": 1}
+    )
+    if deleted is None:
+        await raise_for_failed_write(workspace.tasks, task_id, expected_version, "Task not found")
+    activity_log.record(activity_entry(current_user, ActivityAction.DELETED, ActivityEntity.TASK, task_id,
+                                       campaign_id=deleted.get("campaign_id"), user_ids=[deleted.get("assignee_id")]))
+    return {"message": "Task deleted successfully"}
+
+# Campaign Template Routes
+def validate_blueprints(blueprints: List[TaskBlueprint]):
+    """Reject duplicate keys, unknown dependencies, dependency cycles and overly deep dependency chains"""
+    keys = [blueprint.key for blueprint in blueprints]
+    if len(keys) != len(set(keys)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Task blueprint keys must be unique"
+        )
+
+    dependencies = {blueprint.key: blueprint.depends_on for blueprint in blueprints}
+    for key, depends_on in dependencies.items():
+        unknown = [dependency for dependency in depends_on if dependency not in dependencies]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Task blueprint '{key}' depends on unknown keys: {', '.join(unknown)}"
+            )
+
+    # Iterative depth-first walk so a long chain can't hit the interpreter's recursion limit
+    depth: Dict[str, int] = {}  # Blueprints on the longest chain ending at each finished key
+    visiting = set()
+    for root in dependencies:
+        if root in depth:
+            continue
+        stack = [(root, iter(dependencies[root]))]
+        visiting.add(root)
+        while stack:
+            key, pending = stack[-1]
+            dependency = next(pending, None)
+            if dependency is None:
+                stack.pop()
+                visiting.discard(key)
+                depth[key] = 1 + max((depth[dependency] for dependency in dependencies[key]), default=0)
+                if depth[key] > TEMPLATE_MAX_DEPENDENCY_DEPTH:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Task blueprint dependency chains may be at most {TEMPLATE_MAX_DEPENDENCY_DEPTH} tasks deep"
+                    )
+            elif dependency in visiting:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Task blueprint dependencies contain a cycle through '{dependency}'"
+                )
+            elif dependency not in depth:
+                visiting.add(dependency)
+                stack.append((dependency, iter(dependencies[dependency])))
+
+async def resolve_role_assignees(workspace: WorkspaceDatabase, blueprints: List[TaskBlueprint],
+                                 instantiate_data: TemplateInstantiate) -> Dict[str, str]:
+    """Map blueprint keys to assignees, spreading each role round-robin over matching team members"""
+    overrides = {role.value: user_id for role, user_id in instantiate_data.assignees.items()}
+    referenced = set(instantiate_data.assigned_team) | set(overrides.values())
+    members = []
+    if referenced:
+        # One lookup both validates every referenced user against the workspace and feeds the role matching
+        members = await workspace.users.find(
+            {"id": {"$in": list(referenced)}}, {"_id": 0, "id": 1, "role": 1, "is_active": 1}
+        ).to_list(len(referenced))
+        if len(members) != len(referenced):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Unknown team member in assigned_team or assignees"
+            )
+
+    members_by_role: Dict[str, List[str]] = {}
+    team = set(instantiate_data.assigned_team)
+    for member in members:
+        if member["id"] in team and member.get("is_active", True):
+            members_by_role.setdefault(member["role"], []).append(member["id"])
+
+    assignees = {}
+    next_member: Dict[str, int] = {}
+    for blueprint in blueprints:
+        if blueprint.assignee_role is None:
+            continue
+        role = blueprint.assignee_role.value
+        if role in overrides:
+            assignees[blueprint.key] = overrides[role]
+        elif members_by_role.get(role):
+            candidates = members_by_role[role]
+            index = next_member.get(role, 0)
+            assignees[blueprint.key] = candidates[index % len(candidates)]
+            next_member[role] = index + 1
+    return assignees
+
+@api_router.post("/campaign-templates", response_model=CampaignTemplate, dependencies=[Depends(rate_limit(ROUTE_COST_WRITE))])
+async def create_campaign_template(template_data: CampaignTemplateCreate, current_user: User = Depends(get_current_user),
+                                   workspace: WorkspaceDatabase = Depends(get_workspace)):
+    validate_blueprints(template_data.tasks)
+    template = CampaignTemplate(
+        **template_data.dict(),
+        created_by=current_user.id,
+        workspace_id=workspace.workspace_id
+    )
+
+    template_dict = prepare_for_mongo(template.dict())
+    await workspace.campaign_templates.insert_one(template_dict)
+    activity_log.record(activity_entry(current_user, ActivityAction.CREATED, ActivityEntity.CAMPAIGN_TEMPLATE,
+                                       template.id))
+    return template
+
+@api_router.get("/campaign-templates", response_model=List[CampaignTemplate], dependencies=[Depends(rate_limit(ROUTE_COST_LIST))])
+async def get_campaign_templates(campaign_type: Optional[CampaignType] = None, workspace: WorkspaceDatabase = Depends(get_workspace)):
+    query = {}
+    if campaign_type:
+        query["campaign_type"] = campaign_type.value
+
+    templates = await workspace.campaign_templates.find(query).to_list(1000)
+    return [CampaignTemplate(**parse_from_mongo(template)) for template in templates]
+
+@api_router.get("/campaign-templates/{template_id}", response_model=CampaignTemplate, dependencies=[Depends(rate_limit(ROUTE_COST_DETAIL))])
+async def get_campaign_template(template_id: str, workspace: WorkspaceDatabase = Depends(get_workspace)):
+    template = await workspace.campaign_templates.find_one({"id": template_id})
+    if not template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Campaign template not found"
+        )
+    return CampaignTemplate(**parse_from_mongo(template))
+
+@api_router.delete("/campaign-templates/{template_id}", dependencies=[Depends(rate_limit(ROUTE_COST_WRITE))])
+async def delete_campaign_template(template_id: str, current_user: User = Depends(get_current_user),
+                                   workspace: WorkspaceDatabase = Depends(get_workspace)):
+    result = await workspace.campaign_templates.delete_one({"id": template_id})
     if result.deleted_count == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
+            detail="Campaign template not found"
         )
-    return {"message": "Task deleted successfully"}
+    activity_log.record(activity_entry(current_user, ActivityAction.DELETED, ActivityEntity.CAMPAIGN_TEMPLATE,
+                                       template_id))
+    return {"message": "Campaign template deleted successfully"}
 
-# Team Routes
-@api_router.get("/team", response_model=List[User])
-async def get_team_members(current_user: User = Depends(get_current_user)):
-    users = await db.users.find().to_list(1000)
-    return [User(**parse_from_mongo({k: v for k, v in user.items() if k != 'password'})) for user in users]
-
-@api_router.get("/team/{user_id}", response_model=User)
-async def get_team_member(user_id: str, current_user: User = Depends(get_current_user)):
-    user = await db.users.find_one({"id": user_id})
-    if not user:
+@api_router.post("/campaign-templates/{template_id}/instantiate", response_model=TemplateInstantiation,
+                 dependencies=[Depends(rate_limit(ROUTE_COST_LIST))])
+async def instantiate_campaign_template(template_id: str, instantiate_data: TemplateInstantiate,
+                                        current_user: User = Depends(get_current_user),
+                                        workspace: WorkspaceDatabase = Depends(get_workspace)):
+    """Create a campaign and all of its blueprint tasks with one insert each for the campaign and the tasks"""
+    template = await workspace.campaign_templates.find_one({"id": template_id})
+    if not template:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Team member not found"
+            detail="Campaign template not found"
         )
-    user_data = {k: v for k, v in user.items() if k != 'password'}
-    return User(**parse_from_mongo(user_data))
+    template = CampaignTemplate(**parse_from_mongo(template))
+
+    start_date = instantiate_data.start_date or datetime.now(timezone.utc)
+    end_date = instantiate_data.end_date
+    if end_date is None and template.tasks:
+        end_date = start_date + timedelta(days=max(blueprint.due_offset_days for blueprint in template.tasks))
+
+    campaign = Campaign(
+        title=instantiate_data.title,
+        description=instantiate_data.description or template.description,
+        campaign_type=template.campaign_type,
+        client_name=instantiate_data.client_name,
+        budget=instantiate_data.budget,
+        start_date=start_date,
+        end_date=end_date,
+        assigned_team=instantiate_data.assigned_team,
+        created_by=current_user.id,
+        workspace_id=workspace.workspace_id
+    )
+
+    assignees = await resolve_role_assignees(workspace, template.tasks, instantiate_data)
+
+    # Task IDs are allocated up front so dependencies are remapped in the same pass
+    task_ids = {blueprint.key: str(uuid.uuid4()) for blueprint in template.tasks}
+    ranks = dict(zip(task_ids, evenly_spaced_ranks(len(task_ids))))
+    tasks = [
+        Task(
+            id=task_ids[blueprint.key],
+            title=blueprint.title,
+            description=blueprint.description,
+            campaign_id=campaign.id,
+            assignee_id=assignees.get(blueprint.key),
+            priority=blueprint.priority,
+            due_date=start_date + timedelta(days=blueprint.due_offset_days),
+            estimated_hours=blueprint.estimated_hours,
+            dependencies=[task_ids[key] for key in blueprint.depends_on],
+            rank=ranks[blueprint.key],
+            created_by=current_user.id,
+            workspace_id=workspace.workspace_id
+        )
+        for blueprint in template.tasks
+    ]
 
-@api_router.put("/team/{user_id}", response_model=User)
-async def update_team_member(user_id: str, user_data: dict, current_user: User = Depends(get_current_user)):
-    user = await db.users.find_one({"id": user_id})
+    await workspace.campaigns.insert_one(prepare_for_mongo(campaign.dict()))
+    if tasks:
+        try:
+            await workspace.tasks.insert_many([prepare_for_mongo(task.dict()) for task in tasks], ordered=False)
+        except Exception:
+            # Don't leave a half-materialized campaign behind
+            await workspace.tasks.delete_many({"campaign_id": campaign.id})
+            await workspace.campaigns.delete_one({"id": campaign.id})
+            raise
+        await enqueue_assignment_notifications(tasks, current_user)
+
+    activity_log.record(
+        activity_entry(current_user, ActivityAction.CREATED, ActivityEntity.CAMPAIGN, campaign.id,
+                       campaign_id=campaign.id, user_ids=campaign.assigned_team,
+                       changes={"template_id": template.id}),
+        *[entry for task in tasks for entry in task_created_activity(current_user, task)]
+    )
+    return TemplateInstantiation(campaign=campaign, tasks=tasks)
+
+# Team Routes
+@api_router.get("/team", response_model=List[User], dependencies=[Depends(rate_limit(ROUTE_COST_LIST))])
+async def get_team_members(workspace: WorkspaceDatabase = Depends(get_workspace)):
+    users = await workspace.users.find().to_list(1000)
+    with trace_span("pydantic", model="User", count=len(users)):
+        return [User(**parse_from_mongo({k: v for k, v in user.items() if k != 'password'})) for user in users]
+
+def compute_capacity_timeline(members: List[dict], tasks: List[dict], start: date, end: date,
+                              bucket: CapacityBucket, today: date) -> CapacityTimeline:
+    """Spread each open task's remaining hours evenly over the working days from today to its due date
+    and sum load and capacity per member and bucket.
+
+    Works on whole arrays: tasks become index/rate vectors that are scattered into a per-member
+    difference array, so the cost is O(tasks + members * days) with no per-task Python loop.
+    """
+    days = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+    working_days = np.is_busday(days)
+    n_members, n_days = len(members), len(days)
+
+    member_ids = np.array([member["id"] for member in members], dtype=object)
+    daily_capacity = np.array(
+        [member.get("weekly_capacity_hours", 40.0) or 0.0 for member in members], dtype=float
+    ) / WORKING_DAYS_PER_WEEK
+    load = np.zeros((n_members, n_days + 1))
+
+    if tasks and n_members:
+        assignees = np.array([task["assignee_id"] for task in tasks], dtype=object)
+        # ISO strings: the first ten characters are the (UTC) due date
+        due = np.array([task["due_date"] for task in tasks], dtype='U10').astype('datetime64[D]')
+        estimated = np.array([task.get("estimated_hours") or 0.0 for task in tasks], dtype=float)
+        actual = np.array([task.get("actual_hours") or 0.0 for task in tasks], dtype=float)
+        remaining = np.maximum(estimated - actual, 0.0)
+
+        # Map assignee ids to member rows
+        order = np.argsort(member_ids)
+        sorted_ids = member_ids[order]
+        positions = np.clip(np.searchsorted(sorted_ids, assignees), 0, n_members - 1)
+        known = sorted_ids[positions] == assignees
+        rows = order[positions]
+
+        # Working window: first working day from today through the last working day on/before due
+        window_start = np.full(len(tasks), np.datetime64(today, 'D'))
+        window_start = np.busday_offset(window_start, 0, roll='forward')
+        window_end = np.busday_offset(np.maximum(due, np.datetime64(today, 'D')), 0, roll='backward')
+        window_end = np.maximum(window_end, window_start)
+        hours_per_day = remaining / np.busday_count(window_start, window_end + 1)
+
+        first = (window_start - days[0]).astype(int)
+        last = (window_end - days[0]).astype(int)
+        visible = known & (remaining > 0) & (last >= 0) & (first < n_days)
+        first = np.clip(first[visible], 0, n_days - 1)
+        last = np.clip(last[visible], 0, n_days - 1)
+        rows = rows[visible]
+        rate = hours_per_day[visible]
+
+        np.add.at(load, (rows, first), rate)
+        np.add.at(load, (rows, last + 1), -rate)
+
+    daily_load = np.cumsum(load[:, :-1], axis=1) * working_days
+    capacity = daily_capacity[:, None] * working_days
+
+    if bucket == CapacityBucket.WEEK:
+        # 1970-01-01 was a Thursday, so (epoch day + 3) % 7 is 0 on Mondays
+        epoch_days = days.astype(int)
+        bucket_starts = days - ((epoch_days + 3) % 7)
+    else:
+        bucket_starts = days
+    _, boundaries = np.unique(bucket_starts, return_index=True)
+    bucket_load = np.round(np.add.reduceat(daily_load, boundaries, axis=1), 2)
+    bucket_capacity = np.round(np.add.reduceat(capacity, boundaries, axis=1), 2)
+    overbooked = (bucket_load > bucket_capacity).sum(axis=1)
+
+    return CapacityTimeline(
+        bucket=bucket,
+        buckets=days[boundaries].tolist(),
+        members=[
+            MemberCapacity(
+                user_id=member["id"],
+                name=member["name"],
+                role=member["role"],
+                load_hours=bucket_load[index].tolist(),
+                capacity_hours=bucket_capacity[index].tolist(),
+                overbooked_buckets=int(overbooked[index])
+            )
+            for index, member in enumerate(members)
+        ]
+    )
+
+@api_router.get("/team/capacity", response_model=CapacityTimeline, dependencies=[Depends(rate_limit(ROUTE_COST_CAPACITY))])
+async def get_team_capacity(from_date: date = Query(..., alias="from"), to_date: date = Query(..., alias="to"),
+                            bucket: CapacityBucket = CapacityBucket.WEEK,
+                            workspace: WorkspaceDatabase = Depends(get_workspace)):
+    if to_date < from_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' must not be before 'from'"
+        )
+    if (to_date - from_date).days >= MAX_CAPACITY_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Capacity range is limited to {MAX_CAPACITY_RANGE_DAYS} days"
+        )
+
+    today = datetime.now(timezone.utc).date()
+    members_query = workspace.users.find(
+        {"is_active": True},
+        {"_id": 0, "id": 1, "name": 1, "role": 1, "weekly_capacity_hours": 1}
+    ).to_list(None)
+    if to_date < today:
+        # Open work is only scheduled from today onwards, so a past range has no load
+        members, tasks = await members_query, []
+    else:
+        members, tasks = await asyncio.gather(
+            members_query,
+            workspace.tasks.find(
+                {
+                    "status": {"$ne": TaskStatus.COMPLETED.value},
+                    "assignee_id": {"$ne": None},
+                    "due_date": {"$ne": None},
+                    "estimated_hours": {"$gt": 0}
+                },
+                {"_id": 0, "assignee_id": 1, "due_date": 1, "estimated_hours": 1, "actual_hours": 1}
+            ).to_list(None)
+        )
+
+    return compute_capacity_timeline(members, tasks, from_date, to_date, bucket, today)
+
+@api_router.get("/team/{user_id}", response_model=User, dependencies=[Depends(rate_limit(ROUTE_COST_DETAIL))])
+async def get_team_member(user_id: str, response: Response, workspace: WorkspaceDatabase = Depends(get_workspace)):
+    user = await workspace.users.find_one({"id": user_id})
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Team member not found"
         )
-    
+    user_data = {k: v for k, v in user.items() if k != 'password'}
+    member = User(**parse_from_mongo(user_data))
+    response.headers["ETag"] = etag_for(member.version)
+    return member
+
+@api_router.put("/team/{user_id}", response_model=User, dependencies=[Depends(rate_limit(ROUTE_COST_WRITE))])
+async def update_team_member(user_id: str, user_data: dict, response: Response,
+                             if_match: Optional[str] = Header(None), current_user: User = Depends(get_current_user),
+                             workspace: WorkspaceDatabase = Depends(get_workspace)):
     # Update only provided fields
-    update_data = {k: v for k, v in user_data.items() if v is not None and k != 'id'}
+    update_data = {k: v for k, v in user_data.items() if v is not None and k not in ('id', 'version', 'workspace_id')}
     update_data["updated_at"] = datetime.now(timezone.utc)
     update_data = prepare_for_mongo(update_data)
     
-    await db.users.update_one({"id": user_id}, {"$set": update_data})
-    
-    updated_user = await db.users.find_one({"id": user_id})
-    user_response = {k: v for k, v in updated_user.items() if k != 'password'}
-    return User(**parse_from_mongo(user_response))
+    updated_user = await versioned_update(
+        workspace.users, user_id, parse_if_match(if_match), update_data, "Team member not found",
+        projection={"password": 0}
+    )
+    member = User(**parse_from_mongo(updated_user))
+    activity_log.record(activity_entry(current_user, ActivityAction.UPDATED, ActivityEntity.TEAM_MEMBER, member.id,
+                                       user_ids=[member.id], changes=update_data))
+    response.headers["ETag"] = etag_for(member.version)
+    return member
 
-@api_router.delete("/team/{user_id}")
-async def delete_team_member(user_id: str, current_user: User = Depends(get_current_user)):
+@api_router.delete("/team/{user_id}", dependencies=[Depends(rate_limit(ROUTE_COST_WRITE))])
+async def delete_team_member(user_id: str, current_user: User = Depends(get_current_user),
+                             workspace: WorkspaceDatabase = Depends(get_workspace)):
     # Check if user exists
-    user = await db.users.find_one({"id": user_id})
+    user = await workspace.users.find_one({"id": user_id})
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -428,46 +2701,66 @@ async def delete_team_member(user_id: str, current_user: User = Depends(get_curr
         )
     
     # Delete the user
-    result = await db.users.delete_one({"id": user_id})
+    result = await workspace.users.delete_one({"id": user_id})
     if result.deleted_count == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Team member not found"
         )
     
-    # Also delete or reassign their tasks (optional)
-    await db.tasks.update_many(
-        {"assignee_id": user_id},
-        {"$unset": {"assignee_id": ""}}
+    # Unassign their tasks and drop them from campaign teams, recording each one so the history
+    # shows what was left without an owner (and stored teams keep passing workspace validation)
+    assigned_tasks, staffed_campaigns = await asyncio.gather(
+        workspace.tasks.find({"assignee_id": user_id}, {"_id": 0, "id": 1, "campaign_id": 1}).to_list(None),
+        workspace.campaigns.find({"assigned_team": user_id}, {"_id": 0, "id": 1}).to_list(None)
+    )
+    await asyncio.gather(
+        workspace.tasks.update_many(
+            {"assignee_id": user_id},
+            {"$unset": {"assignee_id": ""}}
+        ),
+        workspace.campaigns.update_many(
+            {"assigned_team": user_id},
+            {"$pull": {"assigned_team": user_id}, "$inc": {"version": 1}}
+        )
+    )
+    activity_log.record(
+        activity_entry(current_user, ActivityAction.DELETED, ActivityEntity.TEAM_MEMBER, user_id, user_ids=[user_id]),
+        *[
+            activity_entry(current_user, ActivityAction.UNASSIGNED, ActivityEntity.TASK, task["id"],
+                           campaign_id=task.get("campaign_id"), user_ids=[user_id], changes={"assignee_id": None})
+            for task in assigned_tasks
+        ],
+        *[
+            activity_entry(current_user, ActivityAction.UNASSIGNED, ActivityEntity.CAMPAIGN, campaign["id"],
+                           campaign_id=campaign["id"], user_ids=[user_id], changes={"removed_from_team": user_id})
+            for campaign in staffed_campaigns
+        ]
     )
     
     return {"message": "Team member deleted successfully"}
 
 # Dashboard Routes
-@api_router.get("/dashboard/stats")
-async def get_dashboard_stats(current_user: User = Depends(get_current_user)):
-    # Get campaign counts by status
-    campaign_counts = {}
-    for status in CampaignStatus:
-        count = await db.campaigns.count_documents({"status": status.value})
-        campaign_counts[status.value] = count
-    
-    # Get task counts by status
-    task_counts = {}
-    for status in TaskStatus:
-        count = await db.tasks.count_documents({"status": status.value})
-        task_counts[status.value] = count
-    
-    # Get overdue tasks
+async def compute_dashboard_stats(workspace: WorkspaceDatabase):
+    """Count campaigns and tasks per status, overdue tasks and active team members concurrently"""
     current_time = datetime.now(timezone.utc).isoformat()
-    overdue_tasks = await db.tasks.count_documents({
-        "due_date": {"$lt": current_time},
-        "status": {"$ne": "completed"}
-    })
-    
-    # Get team member count
-    team_count = await db.users.count_documents({"is_active": True})
-    
+    campaign_statuses = [campaign_status.value for campaign_status in CampaignStatus]
+    task_statuses = [task_status.value for task_status in TaskStatus]
+
+    counts = await asyncio.gather(
+        *[workspace.campaigns.count_documents({"status": value}) for value in campaign_statuses],
+        *[workspace.tasks.count_documents({"status": value}) for value in task_statuses],
+        workspace.tasks.count_documents({
+            "due_date": {"$lt": current_time},
+            "status": {"$ne": "completed"}
+        }),
+        workspace.users.count_documents({"is_active": True})
+    )
+
+    campaign_counts = dict(zip(campaign_statuses, counts[:len(campaign_statuses)]))
+    task_counts = dict(zip(task_statuses, counts[len(campaign_statuses):-2]))
+    overdue_tasks, team_count = counts[-2:]
+
     return {
         "campaigns": campaign_counts,
         "tasks": task_counts,
@@ -475,15 +2768,180 @@ async def get_dashboard_stats(current_user: User = Depends(get_current_user)):
         "team_members": team_count
     }
 
+@api_router.get("/dashboard/stats", dependencies=[Depends(rate_limit(ROUTE_COST_STATS))])
+async def get_dashboard_stats(workspace: WorkspaceDatabase = Depends(get_workspace)):
+    return await compute_dashboard_stats(workspace)
+
+# Bootstrap Routes
+async def find_documents(collection, query: dict, projection: dict, sort: Optional[list] = None,
+                         limit: int = 1000) -> List[dict]:
+    """Fetch raw documents with a projection, skipping pydantic model construction"""
+    cursor = collection.find(query, {"_id": 0, **projection}).limit(limit)
+    if sort:
+        cursor = cursor.sort(sort)
+    return await cursor.to_list(limit)
+
+async def bootstrap_dashboard(workspace: WorkspaceDatabase):
+    stats, campaigns, tasks = await asyncio.gather(
+        compute_dashboard_stats(workspace),
+        find_documents(workspace.campaigns, {}, DASHBOARD_CAMPAIGN_FIELDS,
+                       sort=[("created_at", -1)], limit=DASHBOARD_RECENT_CAMPAIGNS),
+        find_documents(workspace.tasks, {}, DASHBOARD_TASK_FIELDS,
+                       sort=[("created_at", -1)], limit=DASHBOARD_RECENT_TASKS)
+    )
+    return {"stats": stats, "campaigns": campaigns, "tasks": tasks}
+
+async def bootstrap_team(workspace: WorkspaceDatabase):
+    members, tasks = await asyncio.gather(
+        find_documents(workspace.users, {}, TEAM_MEMBER_FIELDS),
+        find_documents(workspace.tasks, {}, WORKLOAD_TASK_FIELDS)
+    )
+    return {"team": members, "tasks": tasks}
+
+async def bootstrap_quick_assign(workspace: WorkspaceDatabase):
+    campaigns, members, tasks = await asyncio.gather(
+        find_documents(workspace.campaigns, {"status": {"$ne": CampaignStatus.COMPLETED.value}},
+                       QUICK_ASSIGN_CAMPAIGN_FIELDS),
+        find_documents(workspace.users, {"is_active": True}, TEAM_MEMBER_FIELDS),
+        find_documents(workspace.tasks, {"status": {"$ne": TaskStatus.COMPLETED.value}},
+                       {"id": 1, "assignee_id": 1, "status": 1})
+    )
+    return {"campaigns": campaigns, "team": members, "tasks": tasks}
+
+BOOTSTRAP_LOADERS = {
+    BootstrapView.DASHBOARD: bootstrap_dashboard,
+    BootstrapView.TEAM: bootstrap_team,
+    BootstrapView.QUICK_ASSIGN: bootstrap_quick_assign,
+}
+
+@api_router.get("/bootstrap", dependencies=[Depends(rate_limit(ROUTE_COST_BOOTSTRAP))])
+async def get_bootstrap(view: BootstrapView, current_user: User = Depends(get_current_user),
+                        workspace: WorkspaceDatabase = Depends(get_workspace)):
+    """Everything a screen needs for first paint, fetched concurrently behind a single auth lookup"""
+    payload = await BOOTSTRAP_LOADERS[view](workspace)
+    return {"view": view.value, "current_user": current_user, **payload}
+
+# Activity Routes
+def parse_activity_cursor(cursor: Optional[str]) -> Optional[int]:
+    if cursor is None:
+        return None
+    if not cursor.isdigit():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid activity cursor"
+        )
+    return int(cursor)
+
+def activity_from_store(entry: dict) -> ActivityEntry:
+    return ActivityEntry(**{**entry, "id": str(entry["seq"]), "at": as_utc(entry["at"])})
+
+@api_router.get("/activity", response_model=ActivityPage, dependencies=[Depends(rate_limit(ROUTE_COST_LIST))])
+async def get_activity(campaign_id: Optional[str] = None, user_id: Optional[str] = None,
+                       before: Optional[str] = None, limit: int = Query(50, ge=1, le=200),
+                       current_user: User = Depends(get_current_user)):
+    """Newest-first history, optionally for one campaign or member; pass `cursor` back as `before` for the next page"""
+    entries = await activity_log.store.history(
+        activity_query(current_user.workspace_id, campaign_id, user_id), parse_activity_cursor(before), limit
+    )
+    return ActivityPage(
+        entries=[activity_from_store(entry) for entry in entries],
+        cursor=str(entries[-1]["seq"]) if len(entries) == limit else None
+    )
+
+@api_router.get("/activity/follow", response_model=ActivityPage, dependencies=[Depends(rate_limit(ROUTE_COST_DETAIL))])
+async def follow_activity(campaign_id: Optional[str] = None, user_id: Optional[str] = None,
+                          after: Optional[str] = None,
+                          wait: float = Query(ACTIVITY_FOLLOW_WAIT_SECONDS, ge=0, le=ACTIVITY_FOLLOW_WAIT_SECONDS),
+                          limit: int = Query(100, ge=1, le=500),
+                          current_user: User = Depends(get_current_user)):
+    """Long-poll for entries newer than `after` (default: now), oldest first; pass `cursor` back as `after`"""
+    after_seq = parse_activity_cursor(after)
+    if after_seq is None:
+        after_seq = await activity_log.store.head()
+    entries = await activity_log.store.follow(
+        activity_query(current_user.workspace_id, campaign_id, user_id), after_seq, wait, limit
+    )
+    return ActivityPage(
+        entries=[activity_from_store(entry) for entry in entries],
+        cursor=str(entries[-1]["seq"]) if entries else str(after_seq)
+    )
+
+# Health Routes
+@api_router.get("/health/ready")
+async def readiness(request: Request, response: Response):
+    """Readiness probe. Reports this worker's connection pool occupancy and checkout waits; under
+    multiple uvicorn workers each probe answers for one process (see `pid`)."""
+    ready = getattr(request.app.state, "warmed_up", False)
+    mongo = {}
+    try:
+        started = time.perf_counter()
+        await asyncio.wait_for(db.command("ping"), timeout=READINESS_TIMEOUT_SECONDS)
+        mongo["ping_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    except Exception as error:
+        ready = False
+        mongo["error"] = str(error) or type(error).__name__
+
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {
+        "status": "ready" if ready else "unavailable",
+        "pid": os.getpid(),
+        "warmed_up": getattr(request.app.state, "warmed_up", False),
+        "mongo": mongo,
+        "pool": pool_monitor.snapshot()
+    }
+
+# Admin Routes
+async def require_admin(current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
+@api_router.get("/admin/traces")
+async def get_traces(limit: int = Query(50, ge=1, le=TRACE_BUFFER_SIZE), path: Optional[str] = None,
+                     min_duration_ms: float = 0, current_user: User = Depends(require_admin)):
+    """Most recent request traces of the admin's workspace, newest first"""
+    traces = [
+        trace.summary() for trace in reversed(trace_buffer)
+        if trace.workspace_id == current_user.workspace_id
+        and (path is None or trace.path.startswith(path)) and (trace.duration or 0) * 1000 >= min_duration_ms
+    ]
+    return traces[:limit]
+
+@api_router.get("/admin/traces/{trace_id}")
+async def get_trace(trace_id: str, current_user: User = Depends(require_admin)):
+    """Full span breakdown and sampling profile of one trace"""
+    for trace in trace_buffer:
+        if trace.id == trace_id and trace.workspace_id == current_user.workspace_id:
+            return trace.to_dict()
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Trace not found"
+    )
+
+@api_router.get("/admin/queue/metrics")
+async def get_queue_metrics(current_user: User = Depends(require_admin)):
+    """Outbox depth per status, age of the oldest ready job and this process's worker counters for the workspace"""
+    return await job_queue.metrics(current_user.workspace_id)
+
 # Include the router in the main app
 app.include_router(api_router)
 
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(ContentNegotiationMiddleware)
+app.add_middleware(AdmissionControlMiddleware)
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After", "ETag", "X-Trace-Id"],
 )
 
 # Configure logging
@@ -493,6 +2951,62 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+async def create_indexes():
+    # Rows written before workspaces existed belong to the default workspace
+    for name in TENANT_COLLECTIONS:
+        await db[name].update_many(
+            {"workspace_id": {"$exists": False}}, {"$set": {"workspace_id": DEFAULT_WORKSPACE_ID}}
+        )
+
+    # Every tenant query is prefixed by workspace_id, which is also the shard key if these
+    # collections are ever sharded (sh.shardCollection(..., {"workspace_id": 1, "id": 1}))
+    await db.users.create_index([("workspace_id", 1), ("id", 1)], unique=True)
+    await db.users.create_index("email")
+    await db.campaigns.create_index([("workspace_id", 1), ("id", 1)], unique=True)
+    await db.campaigns.create_index([("workspace_id", 1), ("status", 1)])
+    await db.campaigns.create_index([("workspace_id", 1), ("created_at", -1)])
+    await db.tasks.create_index([("workspace_id", 1), ("id", 1)], unique=True)
+    await db.tasks.create_index([("workspace_id", 1), ("campaign_id", 1)])
+    await db.tasks.create_index([("workspace_id", 1), ("assignee_id", 1), ("status", 1)])
+    await db.tasks.create_index([("workspace_id", 1), ("status", 1), ("due_date", 1)])
+    await db.tasks.create_index([("workspace_id", 1), ("created_at", -1)])
+    await db.tasks.create_index([("workspace_id", 1), ("campaign_id", 1), ("status", 1), ("rank", 1), ("id", 1)])
+    # Control plane: the due-soon scheduler scans across workspaces
+    await db.tasks.create_index([("due_date", 1), ("status", 1)])
+    await db.campaign_templates.create_index([("workspace_id", 1), ("id", 1)], unique=True)
+
+    if ACTIVITY_STORE == "mongo":
+        try:
+            await db.create_collection(
+                "activity", capped=True, size=ACTIVITY_CAPPED_BYTES, max=ACTIVITY_CAPPED_DOCS
+            )
+        except CollectionInvalid:
+            pass  # Created on an earlier start
+        await db.activity.create_index([("workspace_id", 1), ("seq", -1)])
+        await db.activity.create_index([("workspace_id", 1), ("campaign_id", 1), ("seq", -1)])
+        await db.activity.create_index([("workspace_id", 1), ("user_ids", 1), ("seq", -1)])
+
+    await db.refresh_tokens.create_index("token_hash", unique=True)
+    await db.refresh_tokens.create_index("family_id")
+    await db.refresh_tokens.create_index("expires_at", expireAfterSeconds=0)
+    await db.jobs.create_index([("status", 1), ("run_at", 1)])
+    await db.jobs.create_index([("workspace_id", 1), ("status", 1), ("run_at", 1)])
+    await db.jobs.create_index([("kind", 1), ("workspace_id", 1), ("user_id", 1), ("status", 1), ("run_at", 1)])
+    await db.jobs.create_index("id", unique=True)
+    await db.jobs.create_index("lease_id")
+    await db.jobs.create_index(
+        "dedupe_key", unique=True, partialFilterExpression={"dedupe_key": {"$type": "string"}}
+    )
+    await db.jobs.create_index("completed_at", expireAfterSeconds=JOB_RETENTION_DAYS * 24 * 3600)
+
+    await enqueue_rank_backfill()
+
+async def warm_up():
+    """Open the pool's connections concurrently and touch the hot collections through their indexes,
+    so the first requests after a deploy don't pay for connection setup or cold pages"""
+    await asyncio.gather(*[db.command("ping") for _ in range(max(1, WARMUP_CONNECTIONS))])
+    await asyncio.gather(
+        *[db[name].find_one({"workspace_id": DEFAULT_WORKSPACE_ID}, {"_id": 1}) for name in TENANT_COLLECTIONS],
+        db.jobs.find_one({"status": JobStatus.PENDING.value}, {"_id": 1})
+    )
+    logger.info("Warm-up done: %s", pool_monitor.snapshot())
@@ -0,0 +1,150 @@
+"""Payload size and serialization benchmarks for the list endpoints.
+
+Runs in-process against synthetic Task/Campaign/User lists so it needs no
+database. Pass a base URL to also measure bytes on the wire against a running
+server, e.g. `python backend_benchmark.py http://localhost:8001 <token>`.
+"""
+import gzip
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'benchmark')
+sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+import server  # noqa: E402
+
+REPEATS = 5
+
+
+def build_users(count):
+    roles = list(server.UserRole)
+    return [
+        server.User(
+            email=f"member{i}@example.com",
+            name=f"Team Member {i}",
+            role=roles[i % len(roles)]
+        )
+        for i in range(count)
+    ]
+
+
+def build_campaigns(count, users):
+    types = list(server.CampaignType)
+    return [
+        server.Campaign(
+            title=f"Campaign {i}",
+            description="Quarterly engagement for a long-standing client account",
+            campaign_type=types[i % len(types)],
+            client_name=f"Client {i % 40}",
+            budget=10000.0 + i,
+            start_date=datetime.now(timezone.utc),
+            end_date=datetime.now(timezone.utc) + timedelta(days=90),
+            assigned_team=[user.id for user in users[i % len(users):i % len(users) + 4]],
+            created_by=users[0].id
+        )
+        for i in range(count)
+    ]
+
+
+def build_tasks(count, campaigns, users):
+    statuses = list(server.TaskStatus)
+    priorities = list(server.TaskPriority)
+    return [
+        server.Task(
+            title=f"Deliverable {i}",
+            description="Draft, review and publish the deliverable for this sprint",
+            campaign_id=campaigns[i % len(campaigns)].id,
+            assignee_id=users[i % len(users)].id,
+            status=statuses[i % len(statuses)],
+            priority=priorities[i % len(priorities)],
+            due_date=datetime.now(timezone.utc) + timedelta(days=i % 30),
+            estimated_hours=float(i % 16 + 1),
+            dependencies=[str(uuid.uuid4())] if i % 5 == 0 else [],
+            created_by=users[0].id
+        )
+        for i in range(count)
+    ]
+
+
+def timed(fn):
+    best = None
+    result = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best * 1000
+
+
+def render(content, msgpack_requested):
+    token = server._wants_msgpack.set(msgpack_requested)
+    try:
+        return server.NegotiatedResponse(content).body
+    finally:
+        server._wants_msgpack.reset(token)
+
+
+def benchmark_payload(name, models):
+    content, encode_ms = timed(lambda: jsonable_encoder(models))
+    print(f"\n📦 {name} ({len(models)} items) - jsonable_encoder: {encode_ms:.2f} ms")
+    print(f"   {'encoding':<16}{'bytes':>12}{'render ms':>12}{'gzip':>12}{'br':>12}")
+
+    encodings = [("json", False)]
+    if server.msgpack is not None:
+        encodings.append(("msgpack", True))
+
+    for label, msgpack_requested in encodings:
+        body, render_ms = timed(lambda: render(content, msgpack_requested))
+        gzipped = len(gzip.compress(body, compresslevel=server.GZIP_COMPRESS_LEVEL))
+        brotli_size = "-"
+        if server.brotli is not None:
+            brotli_size = len(server.brotli.compress(body, quality=server.BROTLI_QUALITY))
+        print(f"   {label:<16}{len(body):>12}{render_ms:>12.2f}{gzipped:>12}{brotli_size:>12}")
+
+
+def benchmark_wire(base_url, token):
+    import requests
+
+    print(f"\n🌐 Bytes on the wire against {base_url}")
+    variants = [
+        ("json", {"Accept": "application/json", "Accept-Encoding": "identity"}),
+        ("json+gzip", {"Accept": "application/json", "Accept-Encoding": "gzip"}),
+        ("json+br", {"Accept": "application/json", "Accept-Encoding": "br"}),
+        ("msgpack", {"Accept": server.MSGPACK_MEDIA_TYPE, "Accept-Encoding": "identity"}),
+        ("msgpack+br", {"Accept": server.MSGPACK_MEDIA_TYPE, "Accept-Encoding": "br"}),
+    ]
+    for endpoint in ["tasks", "campaigns", "team"]:
+        for label, headers in variants:
+            headers = {**headers, "Authorization": f"Bearer {token}"}
+            start = time.perf_counter()
+            response = requests.get(f"{base_url}/api/{endpoint}", headers=headers, stream=True, timeout=30)
+            wire_bytes = len(response.raw.read(decode_content=False))
+            elapsed = (time.perf_counter() - start) * 1000
+            encoding = response.headers.get("Content-Encoding", "identity")
+            print(f"   /api/{endpoint:<10}{label:<12}{wire_bytes:>12} bytes{elapsed:>10.1f} ms  ({encoding})")
+
+
+def main():
+    users = build_users(200)
+    campaigns = build_campaigns(300, users)
+    tasks = build_tasks(1000, campaigns, users)
+
+    benchmark_payload("GET /api/tasks", tasks)
+    benchmark_payload("GET /api/campaigns", campaigns)
+    benchmark_payload("GET /api/team", users)
+
+    if len(sys.argv) >= 3:
+        benchmark_wire(sys.argv[1].rstrip('/'), sys.argv[2])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
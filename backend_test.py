@@ -1,7 +1,7 @@
 import requests
 import sys
 import json
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 class MarketingConsultancyAPITester:
     def __init__(self, base_url="https://demand-hub-1.preview.emergentagent.com"):
@@ -13,6 +13,7 @@ class MarketingConsultancyAPITester:
         self.test_user_id = None
         self.test_campaign_id = None
         self.test_task_id = None
+        self.last_headers = {}
 
     def run_test(self, name, method, endpoint, expected_status, data=None, headers=None):
         """Run a single API test"""
@@ -40,6 +41,7 @@ class MarketingConsultancyAPITester:
             elif method == 'DELETE':
                 response = requests.delete(url, headers=test_headers, timeout=10)
 
+            self.last_headers = response.headers
             success = response.status_code == expected_status
             if success:
                 self.tests_passed += 1
@@ -63,6 +65,19 @@ class MarketingConsultancyAPITester:
             print(f"❌ Failed - Error: {str(e)}")
             return False, {}
 
+    def test_health_ready(self):
+        """Test the readiness probe and its connection pool report"""
+        success, response = self.run_test(
+            "Readiness",
+            "GET",
+            "health/ready",
+            200
+        )
+        if success and not all(key in response.get('pool', {}) for key in ['in_use', 'open', 'checkout_wait_ms']):
+            print("❌ Readiness response missing pool stats")
+            return False
+        return success
+
     def test_user_registration(self):
         """Test user registration"""
         test_email = f"test_user_{datetime.now().strftime('%H%M%S')}@example.com"
@@ -99,10 +114,40 @@ class MarketingConsultancyAPITester:
         
         if success and 'access_token' in response:
             self.token = response['access_token']
+            self.refresh_token = response.get('refresh_token')
             print(f"   Got access token: {self.token[:20]}...")
             return True
         return False
 
+    def test_refresh_token_rotation(self):
+        """Test refresh token rotation and reuse detection"""
+        if not getattr(self, 'refresh_token', None):
+            print("❌ No refresh token available")
+            return False
+
+        old_refresh_token = self.refresh_token
+        success, response = self.run_test(
+            "Refresh Session",
+            "POST",
+            "auth/refresh",
+            200,
+            data={"refresh_token": old_refresh_token}
+        )
+        if not success or 'refresh_token' not in response:
+            return False
+        self.token = response['access_token']
+        self.refresh_token = response['refresh_token']
+
+        # Replaying the rotated token must fail and revoke the family
+        success, _ = self.run_test(
+            "Reuse Rotated Refresh Token",
+            "POST",
+            "auth/refresh",
+            401,
+            data={"refresh_token": old_refresh_token}
+        )
+        return success
+
     def test_get_current_user(self):
         """Test getting current user info"""
         success, response = self.run_test(
@@ -222,6 +267,11 @@ class MarketingConsultancyAPITester:
             f"tasks/{self.test_task_id}",
             200
         )
+        if success:
+            self.test_task_etag = self.last_headers.get('ETag')
+            if self.test_task_etag != f'"{response.get("version")}"':
+                print(f"❌ ETag {self.test_task_etag} does not match version {response.get('version')}")
+                return False
         return success
 
     def test_update_task(self):
@@ -244,6 +294,104 @@ class MarketingConsultancyAPITester:
         )
         return success
 
+    def test_update_task_conditional(self):
+        """Test If-Match: a stale version is rejected with 412, a missing task still with 404"""
+        if not self.test_task_id or not getattr(self, 'test_task_etag', None):
+            print("❌ No task ETag available for conditional update")
+            return False
+
+        # The ETag was read before test_update_task bumped the version
+        stale, _ = self.run_test(
+            "Update Task with Stale If-Match",
+            "PUT",
+            f"tasks/{self.test_task_id}",
+            412,
+            data={"status": "in_review"},
+            headers={"If-Match": self.test_task_etag}
+        )
+        missing, _ = self.run_test(
+            "Update Missing Task with If-Match",
+            "PUT",
+            "tasks/00000000-0000-0000-0000-000000000000",
+            404,
+            data={"status": "in_review"},
+            headers={"If-Match": self.test_task_etag}
+        )
+        return stale and missing
+
+    def test_board_ordering(self):
+        """Test moving cards within a board column and paging through it"""
+        success, campaign = self.run_test(
+            "Create Board Campaign",
+            "POST",
+            "campaigns",
+            200,
+            data={"title": "Board Campaign", "campaign_type": "social_media", "client_name": "Board Client"}
+        )
+        if not success:
+            return False
+
+        ids = {}
+        for title in ["A", "B", "C"]:
+            success, task = self.run_test(
+                f"Create Board Task {title}",
+                "POST",
+                "tasks",
+                200,
+                data={"title": title, "campaign_id": campaign['id']}
+            )
+            if not success:
+                return False
+            ids[title] = task['id']
+
+        def column_titles():
+            _, page = self.run_test("Get Board Column", "GET", f"campaigns/{campaign['id']}/board/todo", 200)
+            return [task['title'] for task in page.get('tasks', [])]
+
+        moves = [
+            ("Move Card After", "C", {"after_id": ids["A"]}, ["A", "C", "B"]),
+            ("Move Card to Top", "B", {"before_id": ids["A"]}, ["B", "A", "C"]),
+            ("Move Card Before", "C", {"after_id": ids["B"], "before_id": ids["A"]}, ["B", "C", "A"]),
+            ("Move Card to Bottom", "B", {}, ["C", "A", "B"]),
+        ]
+        for name, title, move, expected in moves:
+            success, _ = self.run_test(name, "PUT", f"tasks/{ids[title]}/position", 200, data=move)
+            order = column_titles()
+            if not success or order != expected:
+                print(f"❌ Expected column order {expected}, got {order}")
+                return False
+
+        success, _ = self.run_test(
+            "Move Card Between Stale Neighbours",
+            "PUT",
+            f"tasks/{ids['C']}/position",
+            409,
+            data={"after_id": ids["B"], "before_id": ids["A"]}
+        )
+        if not success:
+            return False
+
+        success, first_page = self.run_test(
+            "Get Board Column Page 1",
+            "GET",
+            f"campaigns/{campaign['id']}/board/todo?limit=2",
+            200
+        )
+        if not success or not first_page.get('cursor'):
+            print("❌ First board page has no cursor")
+            return False
+        success, second_page = self.run_test(
+            "Get Board Column Page 2",
+            "GET",
+            f"campaigns/{campaign['id']}/board/todo?limit=2&after={first_page['cursor']}",
+            200
+        )
+        titles = [task['title'] for task in first_page['tasks'] + second_page.get('tasks', [])]
+        if not success or titles != ["C", "A", "B"] or second_page.get('cursor') is not None:
+            print(f"❌ Board pages returned {titles}")
+            return False
+        return True
+
     def test_get_team_members(self):
         """Test getting team members"""
         success, response = self.run_test(
@@ -365,6 +513,151 @@ class MarketingConsultancyAPITester:
             print(f"   Found {len(assigned_tasks)} tasks assigned to team member")
         return success
 
+    def test_instantiate_campaign_template(self):
+        """Test instantiating a template remaps dependencies and assigns blueprint roles"""
+        if not hasattr(self, 'second_user_id'):
+            print("❌ No designer available for role assignment")
+            return False
+
+        template_data = {
+            "name": "Launch Template",
+            "campaign_type": "content_strategy",
+            "tasks": [
+                {"key": "brief", "title": "Creative brief", "assignee_role": "designer"},
+                {"key": "draft", "title": "First draft", "due_offset_days": 3, "depends_on": ["brief"]}
+            ]
+        }
+        success, template = self.run_test(
+            "Create Campaign Template",
+            "POST",
+            "campaign-templates",
+            200,
+            data=template_data
+        )
+        if not success:
+            return False
+
+        success, response = self.run_test(
+            "Instantiate Campaign Template",
+            "POST",
+            f"campaign-templates/{template['id']}/instantiate",
+            200,
+            data={
+                "title": "Templated Campaign",
+                "client_name": "Template Client",
+                "start_date": datetime.now(timezone.utc).isoformat(),
+                "assigned_team": [self.second_user_id]
+            }
+        )
+        if not success:
+            return False
+        tasks = {task['title']: task for task in response['tasks']}
+        brief, draft = tasks.get("Creative brief"), tasks.get("First draft")
+        if not brief or not draft or draft['dependencies'] != [brief['id']]:
+            print("❌ Blueprint dependency was not remapped to the created task ID")
+            return False
+        if brief['assignee_id'] != self.second_user_id or draft['assignee_id'] is not None:
+            print("❌ Blueprint role was not assigned to the matching team member")
+            return False
+
+        chain = [
+            {"key": f"step{i}", "title": f"Step {i}", "depends_on": [f"step{i - 1}"] if i else []}
+            for i in range(2000)
+        ]
+        success, _ = self.run_test(
+            "Reject Too Deep Template Dependencies",
+            "POST",
+            "campaign-templates",
+            400,
+            data={"name": "Deep Template", "campaign_type": "content_strategy", "tasks": chain}
+        )
+        return success
+
+    def test_team_capacity(self):
+        """Test the team capacity timeline"""
+        start = datetime.now(timezone.utc).date()
+        end = start + timedelta(days=27)
+        success, response = self.run_test(
+            "Team Capacity",
+            "GET",
+            f"team/capacity?from={start.isoformat()}&to={end.isoformat()}&bucket=week",
+            200
+        )
+        if not success:
+            return False
+        if not response.get('buckets') or not response.get('members'):
+            print("❌ Capacity timeline has no buckets or members")
+            return False
+        for member in response['members']:
+            if len(member['load_hours']) != len(response['buckets']) or len(member['capacity_hours']) != len(response['buckets']):
+                print(f"❌ Capacity series for {member['user_id']} do not match the buckets")
+                return False
+        return True
+
+    def test_workspace_isolation(self):
+        """Test a user from another workspace can neither see nor reference this workspace's data"""
+        if not self.test_campaign_id or not self.test_task_id or not hasattr(self, 'second_user_id'):
+            print("❌ No campaign, task or team member available for isolation checks")
+            return False
+
+        own_token = self.token
+        self.token = None
+        outsider_email = f"outsider_{datetime.now().strftime('%H%M%S%f')}@example.com"
+        try:
+            success, outsider = self.run_test(
+                "Register Outside Workspace",
+                "POST",
+                "auth/register",
+                200,
+                data={"email": outsider_email, "name": "Outsider", "password": "OutsiderPass123!", "role": "designer"}
+            )
+            if not success:
+                return False
+            success, tokens = self.run_test(
+                "Login Outside Workspace",
+                "POST",
+                "auth/login",
+                200,
+                data={"email": outsider_email, "password": "OutsiderPass123!"}
+            )
+            if not success:
+                return False
+            self.token = tokens['access_token']
+
+            checks = [
+                self.run_test("Outsider Get Campaign", "GET", f"campaigns/{self.test_campaign_id}", 404)[0],
+                self.run_test("Outsider Get Task", "GET", f"tasks/{self.test_task_id}", 404)[0],
+                self.run_test("Outsider Update Task", "PUT", f"tasks/{self.test_task_id}", 404,
+                              data={"status": "completed"})[0],
+                self.run_test("Outsider Get Team Member", "GET", f"team/{self.second_user_id}", 404)[0],
+            ]
+            success, campaign = self.run_test(
+                "Outsider Create Campaign",
+                "POST",
+                "campaigns",
+                200,
+                data={"title": "Outsider Campaign", "campaign_type": "pr", "client_name": "Outsider Client"}
+            )
+            if success:
+                checks += [
+                    self.run_test("Outsider Assign Foreign Member", "POST", "tasks", 400,
+                                  data={"title": "Foreign", "campaign_id": campaign['id'],
+                                        "assignee_id": self.second_user_id})[0],
+                    self.run_test("Outsider Depend on Foreign Task", "POST", "tasks", 400,
+                                  data={"title": "Foreign", "campaign_id": campaign['id'],
+                                        "dependencies": [self.test_task_id]})[0],
+                    self.run_test("Outsider Staff Foreign Member", "PUT", f"campaigns/{campaign['id']}", 400,
+                                  data={"title": "Outsider Campaign", "campaign_type": "pr",
+                                        "client_name": "Outsider Client", "assigned_team": [self.second_user_id]})[0],
+                ]
+            _, campaigns = self.run_test("Outsider List Campaigns", "GET", "campaigns", 200)
+            if any(item.get('id') == self.test_campaign_id for item in campaigns):
+                print("❌ Outsider can list this workspace's campaign")
+                return False
+            return success and all(checks)
+        finally:
+            self.token = own_token
+
     def test_get_dashboard_stats(self):
         """Test getting dashboard statistics"""
         success, response = self.run_test(
@@ -378,6 +671,51 @@ class MarketingConsultancyAPITester:
             print(f"   Dashboard stats: {json.dumps(response, indent=2)}")
         return success
 
+    def test_bootstrap_views(self):
+        """Test the per-screen bootstrap payloads"""
+        expected_keys = {
+            "dashboard": ["stats", "campaigns", "tasks"],
+            "team": ["team", "tasks"],
+            "quick_assign": ["campaigns", "team", "tasks"]
+        }
+        all_passed = True
+        for view, keys in expected_keys.items():
+            success, response = self.run_test(
+                f"Bootstrap {view}",
+                "GET",
+                f"bootstrap?view={view}",
+                200
+            )
+            if success and not all(key in response for key in keys):
+                print(f"❌ Bootstrap {view} missing keys: {keys}")
+                success = False
+            all_passed = all_passed and success
+        return all_passed
+
+    def test_activity_feed(self):
+        """Test the campaign activity history and the follow long-poll"""
+        if not self.test_campaign_id:
+            print("❌ No campaign ID available for activity")
+            return False
+
+        success, response = self.run_test(
+            "Campaign Activity",
+            "GET",
+            f"activity?campaign_id={self.test_campaign_id}",
+            200
+        )
+        if success and not response.get('entries'):
+            print("❌ No activity recorded for the campaign")
+            return False
+
+        success, response = self.run_test(
+            "Follow Activity",
+            "GET",
+            "activity/follow?wait=0",
+            200
+        )
+        return success and 'cursor' in response
+
     def test_delete_task(self):
         """Test deleting a task"""
         if not self.test_task_id:
@@ -398,6 +736,9 @@ def main():
     
     tester = MarketingConsultancyAPITester()
     
+    # Test the server is ready before anything else
+    tester.test_health_ready()
+    
     # Test user registration and login
     email, password = tester.test_user_registration()
     if not email:
@@ -410,6 +751,7 @@ def main():
     
     # Test authenticated endpoints
     tester.test_get_current_user()
+    tester.test_refresh_token_rotation()
     
     # Test campaign operations
     tester.test_create_campaign()
@@ -427,13 +769,20 @@ def main():
     tester.test_get_tasks()
     tester.test_get_task_by_id()
     tester.test_update_task()
+    tester.test_update_task_conditional()
+    tester.test_board_ordering()
     
     # Test team task assignment
     tester.test_assign_task_to_team_member()
     tester.test_get_tasks_for_team_member()
+    tester.test_instantiate_campaign_template()
+    tester.test_team_capacity()
+    tester.test_workspace_isolation()
     
     # Test other endpoints
     tester.test_get_dashboard_stats()
+    tester.test_bootstrap_views()
+    tester.test_activity_feed()
     
     # Cleanup
     tester.test_delete_task()
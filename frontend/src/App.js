@@ -21,6 +21,39 @@ const API = `${BACKEND_URL}/api`;
 // Auth Context
 const AuthContext = React.createContext();
 
+// Shared so concurrent 401s trigger a single refresh (a rotated token can only be used once)
+let refreshPromise = null;
+
+const setSession = (accessToken, refreshToken) => {
+  localStorage.setItem('token', accessToken);
+  if (refreshToken) {
+    localStorage.setItem('refresh_token', refreshToken);
+  }
+  axios.defaults.headers.common['Authorization'] = `Bearer ${accessToken}`;
+};
+
+const clearSession = () => {
+  localStorage.removeItem('token');
+  localStorage.removeItem('refresh_token');
+  delete axios.defaults.headers.common['Authorization'];
+};
+
+const refreshSession = () => {
+  if (!refreshPromise) {
+    const refreshToken = localStorage.getItem('refresh_token');
+    refreshPromise = axios
+      .post(`${API}/auth/refresh`, { refresh_token: refreshToken })
+      .then((response) => {
+        setSession(response.data.access_token, response.data.refresh_token);
+        return response.data.access_token;
+      })
+      .finally(() => {
+        refreshPromise = null;
+      });
+  }
+  return refreshPromise;
+};
+
 export const useAuth = () => {
   const context = React.useContext(AuthContext);
   if (!context) {
@@ -33,6 +66,32 @@ const AuthProvider = ({ children }) => {
   const [user, setUser] = useState(null);
   const [loading, setLoading] = useState(true);
 
+  useEffect(() => {
+    // Renew the access token once on 401 and replay the request
+    const interceptor = axios.interceptors.response.use(
+      (response) => response,
+      async (error) => {
+        const original = error.config;
+        const isAuthCall = original?.url?.includes('/auth/refresh') || original?.url?.includes('/auth/login');
+        if (error.response?.status !== 401 || !localStorage.getItem('refresh_token') || isAuthCall || original._retried) {
+          return Promise.reject(error);
+        }
+
+        original._retried = true;
+        try {
+          const accessToken = await refreshSession();
+          original.headers['Authorization'] = `Bearer ${accessToken}`;
+          return axios(original);
+        } catch (refreshError) {
+          clearSession();
+          setUser(null);
+          return Promise.reject(error);
+        }
+      }
+    );
+    return () => axios.interceptors.response.eject(interceptor);
+  }, []);
+
   useEffect(() => {
     const token = localStorage.getItem('token');
     if (token) {
@@ -49,8 +108,7 @@ const AuthProvider = ({ children }) => {
       setUser(response.data);
     } catch (error) {
       console.error('Error fetching current user:', error);
-      localStorage.removeItem('token');
-      delete axios.defaults.headers.common['Authorization'];
+      clearSession();
     } finally {
       setLoading(false);
     }
@@ -59,10 +117,9 @@ const AuthProvider = ({ children }) => {
   const login = async (email, password) => {
     try {
       const response = await axios.post(`${API}/auth/login`, { email, password });
-      const { access_token } = response.data;
+      const { access_token, refresh_token } = response.data;
       
-      localStorage.setItem('token', access_token);
-      axios.defaults.headers.common['Authorization'] = `Bearer ${access_token}`;
+      setSession(access_token, refresh_token);
       
       await fetchCurrentUser();
       return { success: true };
@@ -87,8 +144,11 @@ const AuthProvider = ({ children }) => {
   };
 
   const logout = () => {
-    localStorage.removeItem('token');
-    delete axios.defaults.headers.common['Authorization'];
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (refreshToken) {
+      axios.post(`${API}/auth/logout`, { refresh_token: refreshToken }).catch(() => {});
+    }
+    clearSession();
     setUser(null);
   };
 
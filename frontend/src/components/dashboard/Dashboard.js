@@ -31,15 +31,11 @@ const Dashboard = () => {
 
   const fetchDashboardData = async () => {
     try {
-      const [statsRes, campaignsRes, tasksRes] = await Promise.all([
-        axios.get(`${API}/dashboard/stats`),
-        axios.get(`${API}/campaigns`),
-        axios.get(`${API}/tasks`)
-      ]);
+      const response = await axios.get(`${API}/bootstrap?view=dashboard`);
 
-      setStats(statsRes.data);
-      setCampaigns(campaignsRes.data.slice(0, 5)); // Show only recent 5
-      setTasks(tasksRes.data.slice(0, 8)); // Show only recent 8
+      setStats(response.data.stats);
+      setCampaigns(response.data.campaigns); // Recent 5
+      setTasks(response.data.tasks); // Recent 8
     } catch (error) {
       console.error('Error fetching dashboard data:', error);
       toast.error('Failed to load dashboard data');
@@ -128,15 +128,25 @@ const MyTasksDashboard = () => {
   };
 
   const updateTaskStatus = async (taskId, newStatus) => {
+    const current = myTasks.find(task => task.id === taskId);
     try {
-      await axios.put(`${API}/tasks/${taskId}`, { status: newStatus });
+      const response = await axios.put(
+        `${API}/tasks/${taskId}`,
+        { status: newStatus },
+        { headers: { 'If-Match': `"${current?.version ?? 0}"` } }
+      );
       setMyTasks(myTasks.map(task => 
-        task.id === taskId ? { ...task, status: newStatus } : task
+        task.id === taskId ? response.data : task
       ));
       toast.success('Status atualizado!');
     } catch (error) {
       console.error('Error updating task status:', error);
-      toast.error('Erro ao atualizar status');
+      if (error.response?.status === 412) {
+        toast.error('A tarefa foi alterada por outra pessoa. Dados recarregados.');
+        fetchMyTasks();
+      } else {
+        toast.error('Erro ao atualizar status');
+      }
     }
   };
 
@@ -115,13 +115,20 @@ const EditTaskModal = ({ isOpen, onClose, task, onTaskUpdated }) => {
         actual_hours: formData.actual_hours ? parseFloat(formData.actual_hours) : null
       };
 
-      await axios.put(`${API}/tasks/${task.id}`, updateData);
+      await axios.put(`${API}/tasks/${task.id}`, updateData, {
+        headers: { 'If-Match': `"${task.version ?? 0}"` }
+      });
       toast.success('Tarefa atualizada com sucesso!');
       onTaskUpdated();
       onClose();
     } catch (error) {
       console.error('Error updating task:', error);
-      toast.error(error.response?.data?.detail || 'Erro ao atualizar tarefa');
+      if (error.response?.status === 412) {
+        toast.error('A tarefa foi alterada por outra pessoa. Feche e abra novamente para ver a versão atual.');
+        onTaskUpdated();
+      } else {
+        toast.error(error.response?.data?.detail || 'Erro ao atualizar tarefa');
+      }
     } finally {
       setLoading(false);
     }
@@ -111,19 +111,36 @@ const TaskList = () => {
       }
     }
 
+    // A single campaign and status is one board column: show it in its persisted order.
+    // Ranks compare byte by byte (like Mongo does), not with localeCompare.
+    if (campaignFilter !== 'all' && statusFilter !== 'all') {
+      const byKey = (a, b) => (a < b ? -1 : a > b ? 1 : 0);
+      filtered = [...filtered].sort((a, b) => byKey(a.rank || '', b.rank || '') || byKey(a.id, b.id));
+    }
+
     setFilteredTasks(filtered);
   };
 
   const updateTaskStatus = async (taskId, newStatus) => {
+    const current = tasks.find(task => task.id === taskId);
     try {
-      await axios.put(`${API}/tasks/${taskId}`, { status: newStatus });
+      const response = await axios.put(
+        `${API}/tasks/${taskId}`,
+        { status: newStatus },
+        { headers: { 'If-Match': `"${current?.version ?? 0}"` } }
+      );
       setTasks(tasks.map(task => 
-        task.id === taskId ? { ...task, status: newStatus } : task
+        task.id === taskId ? response.data : task
       ));
       toast.success('Status da tarefa atualizado');
     } catch (error) {
       console.error('Error updating task status:', error);
-      toast.error('Erro ao atualizar status da tarefa');
+      if (error.response?.status === 412) {
+        toast.error('A tarefa foi alterada por outra pessoa. Dados recarregados.');
+        fetchData();
+      } else {
+        toast.error('Erro ao atualizar status da tarefa');
+      }
     }
   };
 
@@ -67,13 +67,20 @@ const EditTeamMemberModal = ({ isOpen, onClose, member, onMemberUpdated }) => {
     setLoading(true);
 
     try {
-      await axios.put(`${API}/team/${member.id}`, formData);
+      await axios.put(`${API}/team/${member.id}`, formData, {
+        headers: { 'If-Match': `"${member.version ?? 0}"` }
+      });
       toast.success('Team member updated successfully!');
       onMemberUpdated();
       onClose();
     } catch (error) {
       console.error('Error updating team member:', error);
-      toast.error(error.response?.data?.detail || 'Failed to update team member');
+      if (error.response?.status === 412) {
+        toast.error('This member was changed by someone else. Reopen to see the latest version.');
+        onMemberUpdated();
+      } else {
+        toast.error(error.response?.data?.detail || 'Failed to update team member');
+      }
     } finally {
       setLoading(false);
     }
@@ -48,14 +48,10 @@ const QuickTaskAssignment = ({ isOpen, onClose, onTaskCreated, preSelectedMember
 
   const fetchData = async () => {
     try {
-      const [campaignsRes, teamRes, tasksRes] = await Promise.all([
-        axios.get(`${API}/campaigns`),
-        axios.get(`${API}/team`),
-        axios.get(`${API}/tasks`)
-      ]);
-      setCampaigns(campaignsRes.data.filter(c => c.status !== 'completed'));
-      setTeamMembers(teamRes.data.filter(m => m.is_active));
-      setTasks(tasksRes.data);
+      const response = await axios.get(`${API}/bootstrap?view=quick_assign`);
+      setCampaigns(response.data.campaigns);
+      setTeamMembers(response.data.team);
+      setTasks(response.data.tasks);
     } catch (error) {
       console.error('Error fetching data:', error);
     }
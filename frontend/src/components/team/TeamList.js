@@ -38,7 +38,6 @@ const API = `${BACKEND_URL}/api`;
 const TeamList = () => {
   const [teamMembers, setTeamMembers] = useState([]);
   const [tasks, setTasks] = useState([]);
-  const [campaigns, setCampaigns] = useState([]);
   const [filteredMembers, setFilteredMembers] = useState([]);
   const [loading, setLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState('');
@@ -57,15 +56,10 @@ const TeamList = () => {
 
   const fetchData = async () => {
     try {
-      const [membersRes, tasksRes, campaignsRes] = await Promise.all([
-        axios.get(`${API}/team`),
-        axios.get(`${API}/tasks`),
-        axios.get(`${API}/campaigns`)
-      ]);
+      const response = await axios.get(`${API}/bootstrap?view=team`);
       
-      setTeamMembers(membersRes.data);
-      setTasks(tasksRes.data);
-      setCampaigns(campaignsRes.data);
+      setTeamMembers(response.data.team);
+      setTasks(response.data.tasks);
     } catch (error) {
       console.error('Error fetching team data:', error);
       toast.error('Failed to load team data');
@@ -290,7 +284,6 @@ const TeamList = () => {
       <WorkloadChart 
         teamMembers={teamMembers}
         tasks={tasks}
-        campaigns={campaigns}
       />
 
       {/* Team Members Grid */}
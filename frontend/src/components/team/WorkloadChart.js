@@ -12,7 +12,7 @@ import {
   Minus
 } from 'lucide-react';
 
-const WorkloadChart = ({ teamMembers, tasks, campaigns }) => {
+const WorkloadChart = ({ teamMembers, tasks }) => {
   const getInitials = (name) => {
     return name
       .split(' ')
@@ -0,0 +1,143 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+import server
+from server import AdmissionControlMiddleware, TokenBucketLimiter, User
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(server.time, "monotonic", fake)
+    return fake
+
+
+def test_bucket_spends_burst_then_refills(clock):
+    limiter = TokenBucketLimiter(burst=10, refill_per_second=2)
+
+    assert limiter.consume("u1", 6) == 0
+    assert limiter.consume("u1", 4) == 0
+    assert limiter.consume("u1", 3) == pytest.approx(1.5)
+
+    clock.now += 1.5
+    assert limiter.consume("u1", 3) == 0
+
+    clock.now += 60
+    assert limiter.consume("u1", 10) == 0  # Refill is capped at the burst
+    assert limiter.consume("u1", 1) == pytest.approx(0.5)
+
+
+def test_bucket_evicts_least_recently_used_key(clock):
+    limiter = TokenBucketLimiter(burst=5, refill_per_second=1, max_keys=2)
+    limiter.consume("a", 5)
+    limiter.consume("b", 5)
+    limiter.consume("a", 0)
+    limiter.consume("c", 1)
+
+    assert list(limiter.buckets) == ["a", "c"]
+    # An evicted key starts again from a full bucket
+    assert limiter.consume("b", 5) == 0
+
+
+def test_rate_limit_dependency_sets_retry_after(clock, monkeypatch):
+    monkeypatch.setattr(server, "rate_limiter", TokenBucketLimiter(burst=5, refill_per_second=0.4))
+    user = User(email="rate@example.com", name="Rate", role="designer")
+    check = server.rate_limit(5)
+
+    asyncio.run(check(current_user=user))
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(check(current_user=user))
+
+    assert error.value.status_code == 429
+    assert error.value.headers["Retry-After"] == "13"  # ceil(5 / 0.4)
+
+
+class Exchange:
+    """Drive one request through the middleware and capture the response start"""
+
+    def __init__(self, path="/api/tasks"):
+        self.scope = {"type": "http", "method": "GET", "path": path, "headers": [], "query_string": b""}
+        self.status = None
+        self.headers = {}
+
+    async def receive(self):
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            self.headers = {key.decode(): value.decode() for key, value in message["headers"]}
+
+    async def run(self, middleware):
+        await middleware(self.scope, self.receive, self.send)
+        return self
+
+
+def blocking_app(release: asyncio.Event):
+    async def app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+    return app
+
+
+async def admitted(middleware):
+    """Wait until the request in flight holds its slot"""
+    while middleware.waiting or not middleware.semaphore.locked():
+        await asyncio.sleep(0)
+
+
+def test_admission_sheds_requests_that_would_wait_past_the_budget():
+    async def scenario():
+        release = asyncio.Event()
+        middleware = AdmissionControlMiddleware(blocking_app(release), max_concurrent=1, latency_budget_ms=50)
+        holder = asyncio.create_task(Exchange().run(middleware))
+        await admitted(middleware)
+
+        started = time.monotonic()
+        queued = await Exchange().run(middleware)
+        waited = time.monotonic() - started
+
+        release.set()
+        return (await holder), queued, waited
+
+    holder, queued, waited = asyncio.run(scenario())
+    assert holder.status == 200
+    assert queued.status == 503
+    assert int(queued.headers["retry-after"]) >= 1
+    assert 0.04 < waited < 1
+
+
+def test_admission_rejects_immediately_when_expected_wait_exceeds_budget():
+    async def scenario():
+        release = asyncio.Event()
+        middleware = AdmissionControlMiddleware(blocking_app(release), max_concurrent=1, latency_budget_ms=50)
+        middleware.avg_service_time = 2.0
+        holder = asyncio.create_task(Exchange().run(middleware))
+        await admitted(middleware)
+
+        started = time.monotonic()
+        rejected = await Exchange().run(middleware)
+        waited = time.monotonic() - started
+
+        exempt = asyncio.create_task(Exchange("/api/health/ready").run(middleware))
+        release.set()
+        await holder
+        return rejected, waited, await exempt
+
+    rejected, waited, exempt = asyncio.run(scenario())
+    assert rejected.status == 503
+    assert rejected.headers["retry-after"] == "2"  # (0 waiting + 1) / 1 slot * 2 s
+    assert waited < 0.04
+    assert exempt.status == 200
@@ -0,0 +1,61 @@
+from datetime import date
+
+from server import CapacityBucket, compute_capacity_timeline
+
+MEMBER = {"id": "u1", "name": "Dana", "role": "designer", "weekly_capacity_hours": 40.0}
+
+
+def task(due_date, estimated_hours, actual_hours=None, assignee_id="u1"):
+    return {
+        "assignee_id": assignee_id,
+        "due_date": f"{due_date}T17:00:00+00:00",
+        "estimated_hours": estimated_hours,
+        "actual_hours": actual_hours,
+    }
+
+
+def daily(tasks, start, end, today):
+    timeline = compute_capacity_timeline([MEMBER], tasks, start, end, CapacityBucket.DAY, today)
+    return dict(zip(timeline.buckets, timeline.members[0].load_hours))
+
+
+def test_work_starting_on_a_weekend_rolls_forward_to_monday():
+    # Saturday 2026-10-17: six hours due Wednesday land on Monday to Wednesday
+    load = daily([task("2026-10-21", 6.0)], date(2026, 10, 17), date(2026, 10, 22), today=date(2026, 10, 17))
+    assert load == {
+        date(2026, 10, 17): 0.0,
+        date(2026, 10, 18): 0.0,
+        date(2026, 10, 19): 2.0,
+        date(2026, 10, 20): 2.0,
+        date(2026, 10, 21): 2.0,
+        date(2026, 10, 22): 0.0,
+    }
+
+
+def test_due_date_on_a_weekend_rolls_back_to_friday():
+    load = daily([task("2026-10-25", 10.0)], date(2026, 10, 19), date(2026, 10, 25), today=date(2026, 10, 19))
+    assert [load[date(2026, 10, day)] for day in range(19, 26)] == [2.0, 2.0, 2.0, 2.0, 2.0, 0.0, 0.0]
+
+
+def test_past_due_work_is_clamped_onto_today():
+    load = daily([task("2026-10-14", 8.0)], date(2026, 10, 19), date(2026, 10, 21), today=date(2026, 10, 19))
+    assert load == {date(2026, 10, 19): 8.0, date(2026, 10, 20): 0.0, date(2026, 10, 21): 0.0}
+
+
+def test_logged_hours_and_unknown_assignees_add_no_load():
+    tasks = [task("2026-10-21", 4.0, actual_hours=6.0), task("2026-10-21", 4.0, assignee_id="someone-else")]
+    load = daily(tasks, date(2026, 10, 19), date(2026, 10, 21), today=date(2026, 10, 19))
+    assert set(load.values()) == {0.0}
+
+
+def test_week_buckets_start_on_mondays_after_a_partial_first_week():
+    # Wednesday 2026-10-14 to Tuesday 2026-10-27
+    timeline = compute_capacity_timeline(
+        [MEMBER], [task("2026-10-23", 50.0)], date(2026, 10, 14), date(2026, 10, 27),
+        CapacityBucket.WEEK, today=date(2026, 10, 19)
+    )
+    member = timeline.members[0]
+    assert timeline.buckets == [date(2026, 10, 14), date(2026, 10, 19), date(2026, 10, 26)]
+    assert member.capacity_hours == [24.0, 40.0, 16.0]
+    assert member.load_hours == [0.0, 50.0, 0.0]
+    assert member.overbooked_buckets == 1
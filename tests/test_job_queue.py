@@ -0,0 +1,110 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+import server
+from server import JobKind, JobQueue, JobStatus, new_job
+
+
+@pytest.fixture
+def jobs_db(monkeypatch):
+    database = AsyncMongoMockClient()["test_jobs"]
+    monkeypatch.setattr(server, "db", database)
+    return database
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def notification(user_id, workspace_id="acme", **kwargs):
+    return new_job(JobKind.NOTIFICATION, {"type": "test"}, workspace_id=workspace_id, user_id=user_id, **kwargs)
+
+
+def rebalance(workspace_id):
+    return new_job(JobKind.RANK_REBALANCE, {"campaign_id": "c1", "status": "todo"}, workspace_id=workspace_id)
+
+
+def test_claim_leases_ready_jobs_of_one_user_as_a_batch(jobs_db):
+    later = datetime.now(timezone.utc) + timedelta(hours=1)
+    run(server.enqueue_jobs([
+        notification("u1"), notification("u1"), notification("u2"), notification("u1", run_at=later)
+    ]))
+
+    batch = run(JobQueue(None, workers=0).claim_batch())
+
+    assert len(batch) == 2
+    assert {job["user_id"] for job in batch} == {"u1"}
+    assert all(job["status"] == JobStatus.LEASED.value and job["attempts"] == 1 for job in batch)
+    assert len({job["lease_id"] for job in batch}) == 1
+
+
+def test_claim_does_not_batch_across_workspaces(jobs_db):
+    run(server.enqueue_jobs([rebalance("acme"), rebalance("globex")]))
+    queue = JobQueue(None, workers=0)
+
+    first, second = run(queue.claim_batch()), run(queue.claim_batch())
+
+    assert len(first) == len(second) == 1
+    assert {first[0]["workspace_id"], second[0]["workspace_id"]} == {"acme", "globex"}
+
+
+def test_claim_reclaims_expired_leases_only(jobs_db):
+    job = notification("u1")
+    run(server.enqueue_jobs([job]))
+    queue = JobQueue(None, workers=0)
+    assert run(queue.claim_batch())
+    assert run(queue.claim_batch()) == []
+
+    run(jobs_db.jobs.update_one(
+        {"id": job["id"]}, {"$set": {"lease_until": datetime.now(timezone.utc) - timedelta(seconds=1)}}
+    ))
+    reclaimed = run(queue.claim_batch())
+
+    assert [claimed["id"] for claimed in reclaimed] == [job["id"]]
+    assert reclaimed[0]["attempts"] == 2
+
+
+def test_failed_batch_is_retried_with_backoff_then_buried(jobs_db, monkeypatch):
+    monkeypatch.setattr(server, "JOB_MAX_ATTEMPTS", 2)
+    job = notification("u1")
+    run(server.enqueue_jobs([job]))
+    queue = JobQueue(None, workers=0)
+
+    async def fail(jobs):
+        raise RuntimeError("sink down")
+    queue.register(JobKind.NOTIFICATION, fail)
+
+    run(queue.process(run(queue.claim_batch())))
+    retried = run(jobs_db.jobs.find_one({"id": job["id"]}))
+    assert retried["status"] == JobStatus.PENDING.value
+    assert retried["last_error"] == "sink down"
+    assert "lease_id" not in retried
+    assert server.as_utc(retried["run_at"]) > datetime.now(timezone.utc)
+
+    run(jobs_db.jobs.update_one({"id": job["id"]}, {"$set": {"run_at": datetime.now(timezone.utc)}}))
+    run(queue.process(run(queue.claim_batch())))
+    buried = run(jobs_db.jobs.find_one({"id": job["id"]}))
+    assert buried["status"] == JobStatus.DEAD.value
+    assert buried["attempts"] == 2
+    assert queue.failed["acme"] == 2
+
+
+def test_processed_batch_is_done_and_counted_per_workspace(jobs_db):
+    run(server.enqueue_jobs([notification("u1"), notification("u2", workspace_id="globex")]))
+    queue = JobQueue(None, workers=0)
+    delivered = []
+
+    async def deliver(jobs):
+        delivered.extend(jobs)
+    queue.register(JobKind.NOTIFICATION, deliver)
+
+    for _ in range(2):
+        run(queue.process(run(queue.claim_batch())))
+
+    assert len(delivered) == 2
+    assert run(jobs_db.jobs.count_documents({"status": JobStatus.DONE.value})) == 2
+    assert queue.processed == {"acme": 1, "globex": 1}
+    assert run(queue.metrics("acme"))["depth"][JobStatus.DONE.value] == 1
@@ -0,0 +1,54 @@
+from datetime import datetime, timezone
+
+import msgpack
+from fastapi.encoders import jsonable_encoder
+
+import server
+from server import MSGPACK_EXT_TABLE, Task, msgpack_compact, msgpack_ext_hook
+
+
+def render(content):
+    token = server._wants_msgpack.set(True)
+    try:
+        return server.NegotiatedResponse(content).body
+    finally:
+        server._wants_msgpack.reset(token)
+
+
+def unpack(body):
+    return msgpack.unpackb(body, timestamp=3, ext_hook=msgpack_ext_hook)
+
+
+def test_datetimes_become_timestamps():
+    due = datetime(2026, 10, 19, 9, 30, 15, 123456, tzinfo=timezone.utc)
+    content = jsonable_encoder({"due_date": due, "label": "2026-10-19", "note": "due 2026-10-19T09:30:15Z soon"})
+
+    packed = msgpack_compact(content)
+
+    assert isinstance(packed["due_date"], msgpack.Timestamp)
+    assert packed["label"] == "2026-10-19"
+    assert packed["note"] == content["note"]
+    assert unpack(render(content))["due_date"] == due
+
+
+def test_lists_of_same_keyed_objects_become_tables():
+    tasks = [Task(title=f"Task {i}", campaign_id="c1", created_by="u1", dependencies=[]) for i in range(3)]
+    content = jsonable_encoder({"tasks": tasks, "mixed": [{"a": 1}, {"b": 2}]})
+
+    packed = msgpack_compact(content)
+    decoded = unpack(render(content))
+
+    assert isinstance(packed["tasks"], msgpack.ExtType) and packed["tasks"].code == MSGPACK_EXT_TABLE
+    assert packed["mixed"] == [{"a": 1}, {"b": 2}]
+    assert [task["title"] for task in decoded["tasks"]] == ["Task 0", "Task 1", "Task 2"]
+    assert decoded["tasks"][0]["created_at"] == tasks[0].created_at
+    assert set(decoded["tasks"][0]) == set(content["tasks"][0])
+
+
+def test_compact_msgpack_is_much_smaller_than_json():
+    tasks = jsonable_encoder([
+        Task(title=f"Task {i}", campaign_id="c1", created_by="u1", dependencies=[]) for i in range(200)
+    ])
+    json_body = server.NegotiatedResponse(tasks).body
+
+    assert len(render(tasks)) < len(json_body) * 0.6
@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from server import RANK_DIGITS, evenly_spaced_ranks, rank_between
+
+
+def assert_between(lower, upper, rank):
+    assert rank and not rank.endswith(RANK_DIGITS[0])
+    if lower is not None:
+        assert lower < rank
+    if upper is not None:
+        assert rank < upper
+
+
+@pytest.mark.parametrize("lower, upper", [
+    (None, None),
+    ("V", None),
+    (None, "V"),
+    ("A", "B"),
+    ("A", "A1"),
+    ("A1", "A2"),
+    ("Az", "B"),
+    ("zz", None),
+    (None, "01"),
+])
+def test_rank_between_orders_strictly(lower, upper):
+    assert_between(lower, upper, rank_between(lower, upper))
+
+
+def test_rank_between_appends_step_one_digit():
+    ranks = [rank_between(None, None)]
+    for _ in range(1000):
+        ranks.append(rank_between(ranks[-1], None))
+        assert_between(ranks[-2], None, ranks[-1])
+    # Appending to the bottom of a fresh column keeps single-digit keys until the digits run out
+    assert all(len(rank) == 1 for rank in ranks[:len(RANK_DIGITS) // 2])
+
+
+def test_rank_between_repeated_inserts_stay_ordered():
+    generator = random.Random(7)
+    ranks = [rank_between(None, None)]
+    for _ in range(500):
+        index = generator.randint(0, len(ranks))
+        lower = ranks[index - 1] if index > 0 else None
+        upper = ranks[index] if index < len(ranks) else None
+        rank = rank_between(lower, upper)
+        assert_between(lower, upper, rank)
+        ranks.insert(index, rank)
+    assert ranks == sorted(ranks)
+    assert len(set(ranks)) == len(ranks)
+
+
+def test_rank_between_top_of_column_has_room():
+    rank = rank_between(None, None)
+    for _ in range(200):
+        next_rank = rank_between(None, rank)
+        assert_between(None, rank, next_rank)
+        rank = next_rank
+
+
+@pytest.mark.parametrize("count", [0, 1, 2, 61, 62, 63, 1000, 5000])
+def test_evenly_spaced_ranks(count):
+    ranks = evenly_spaced_ranks(count)
+    assert len(ranks) == count
+    assert ranks == sorted(ranks)
+    assert len(set(ranks)) == count
+    for rank in ranks:
+        assert rank and not rank.endswith(RANK_DIGITS[0])
+
+
+def test_evenly_spaced_ranks_leave_room_between_neighbours():
+    ranks = evenly_spaced_ranks(100)
+    for lower, upper in zip([None, *ranks], [*ranks, None]):
+        assert len(rank_between(lower, upper)) <= max(len(lower or ""), len(upper or "")) + 1